@@ -1,4 +1,6 @@
+import argparse
 import json  
+import os
 from rich.console import Console  
 from rich.table import Table  
 from rich.panel import Panel  
@@ -8,9 +10,26 @@ from collections import Counter
 import re  
 from rich.style import Style  
 from rich.text import Text  
+import csv
+from utils.analysis import ProblemIndex, ResultColumns, ResultMatrix, expand_paths, load_many, summarize
+from utils.checkpoint import ERROR_LABELS, SQLiteResultStore, classify_failure
 
 console = Console()  
 
+DEFAULT_MODEL_FILES = [
+    "fixed_Result_DeepSeek_R1_671B-fix.json",
+    "fixed_checkpoint_DeepSeek_V3-fix.json",
+    "Result_Spark_4.0_Ultra-fix.json",
+    "fixed_checkpoint_DeepSeek_R1_Qwen_32B-fix.json",
+]
+
+MODEL_NAMES = {
+    "fixed_Result_DeepSeek_R1_671B-fix.json": "DeepSeek-R1-671B",
+    "fixed_checkpoint_DeepSeek_V3-fix.json": "DeepSeek-V3",
+    "Result_Spark_4.0_Ultra-fix.json": "Spark-4.0-Ultra",
+    "fixed_checkpoint_DeepSeek_R1_Qwen_32B-fix.json": "DeepSeek-R1-Qwen-32B",
+}
+
 def load_and_analyze_data(file_path):  
     with open(file_path, 'r', encoding='utf-8') as f:  
         data = json.load(f)  
@@ -23,13 +42,9 @@ def load_and_analyze_data(file_path):
     
     failure_reasons = []  
     for item in data.values():  
-        if not item['passed']:  
-            if "Runtime Error" in item['message']:  
-                failure_reasons.append("运行时错误")  
-            elif "Wrong Answer" in item['message']:  
-                failure_reasons.append("答案错误")  
-            else:  
-                failure_reasons.append("其他错误")  
+        error_type = classify_failure(item['passed'], item['message'])
+        if error_type is not None:
+            failure_reasons.append(ERROR_LABELS[error_type])
     
     failure_counts = Counter(failure_reasons)  
     
@@ -41,6 +56,22 @@ def load_and_analyze_data(file_path):
         'models': list(models)  
     }  
 
+def load_stats_from_db(db_path):
+    """从SQLite结果库中按 (model, stage) 汇总统计，结果格式与 load_and_analyze_data 一致"""
+    store = SQLiteResultStore(db_path)
+    all_stats = {}
+    for (model, stage), summary in store.summary().items():
+        all_stats[f"{model}/{stage}"] = {
+            'total': summary['total'],
+            'passed': summary['passed'],
+            'failed': summary['total'] - summary['passed'],
+            'failure_counts': Counter({ERROR_LABELS[error_type]: count
+                                       for error_type, count in summary['failure_counts'].items()}),
+            'models': [model]
+        }
+    store.close()
+    return all_stats
+
 def create_comparison_table(all_stats):  
     table = Table(  
         title="模型对比分析",  
@@ -60,7 +91,7 @@ def create_comparison_table(all_stats):
     }  
     
     for model_file in all_stats.keys():  
-        model_name = model_names.get(model_file.replace("-fix.json", ""), model_file)  
+        model_name = model_names.get(os.path.basename(model_file).replace("-fix.json", ""), model_file)
         table.add_column(model_name, style="magenta", justify="center")  
 
     row_values = ["总测试数"]  
@@ -87,6 +118,100 @@ def create_comparison_table(all_stats):
     
     return table  
 
+def create_slice_table(all_stats, model_names, key='by_source', title="分数据集通过率", label="数据集"):
+    """按切片（数据集来源 ITSP / YBK、题目难度）的通过率对比"""
+    table = Table(
+        title=title,
+        title_style="bold magenta",
+        border_style="blue",
+        show_header=True,
+        header_style="bold cyan"
+    )
+    table.add_column(label, style="cyan")
+    for model_file in all_stats.keys():
+        table.add_column(model_names.get(model_file, model_file), style="magenta", justify="center")
+
+    sources = []
+    for stats in all_stats.values():
+        for source in stats.get(key, {}):
+            if source not in sources:
+                sources.append(source)
+
+    for source in sources:
+        row_values = [source]
+        for stats in all_stats.values():
+            source_stats = stats.get(key, {}).get(source)
+            if not source_stats:
+                row_values.append("-")
+                continue
+            percentage = source_stats['passed'] / source_stats['total'] * 100
+            row_values.append(f"{percentage:.2f}% ({source_stats['total']})")
+        table.add_row(*row_values)
+
+    return table
+
+def create_agreement_table(matrix, model_names):
+    """两两模型在共同测试点上的结论一致率"""
+    table = Table(
+        title="模型结论一致率",
+        title_style="bold magenta",
+        border_style="blue",
+        show_header=True,
+        header_style="bold cyan"
+    )
+    names = [model_names.get(name, name) for name in matrix.names]
+    table.add_column("", style="cyan")
+    for name in names:
+        table.add_column(name, justify="center")
+
+    agreement = matrix.agreement()
+    for i, name in enumerate(names):
+        row_values = [name]
+        for j in range(len(names)):
+            rate = agreement[i, j]
+            row_values.append("-" if rate != rate else f"{rate * 100:.2f}%")
+        table.add_row(*row_values)
+
+    return table
+
+def create_problem_table(matrix, problem_index, model_names, top=20):
+    """模型间通过率差异最大的题目；只有一个模型时为通过率最低的题目"""
+    table = Table(
+        title=f"通过率差异最大的 {top} 道题" if len(matrix.names) > 1 else f"通过率最低的 {top} 道题",
+        title_style="bold magenta",
+        border_style="blue",
+        show_header=True,
+        header_style="bold cyan"
+    )
+    table.add_column("题目", style="cyan")
+    table.add_column("数据集", style="cyan")
+    table.add_column("提交数", justify="center")
+    for name in matrix.names:
+        table.add_column(model_names.get(name, name), justify="center")
+
+    for item in matrix.problem_spread(problem_index, top=top):
+        row_values = [item['problem'], item['source'], str(int(item['total'].max()))]
+        row_values.extend(f"{rate * 100:.1f}%" for rate in item['rates'])
+        table.add_row(*row_values)
+
+    return table
+
+def export_problem_report(matrix, problem_index, model_names, output_file):
+    """导出每道题在各模型上的通过率，便于定位退步的题目"""
+    counts = matrix.per_problem(problem_index)
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        header = ["problem", "source"]
+        for name in matrix.names:
+            display = model_names.get(name, name)
+            header.extend([f"{display}_total", f"{display}_passed"])
+        writer.writerow(header)
+        for p, label in enumerate(problem_index.problem_labels):
+            row = [label, problem_index.sources[problem_index.problem_sources[p]]]
+            for m in range(len(matrix.names)):
+                row.extend([int(counts['total'][m, p]), int(counts['passed'][m, p])])
+            writer.writerow(row)
+
 def create_result_visualization(stats, model_name, width=120):  
     total = stats['total']  
     passed = stats['passed']  
@@ -131,7 +256,29 @@ def create_task_info_panel():
         padding=(1, 2)  
     )  
 
-def main():  
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="LLM多模型对比分析报告")
+    parser.add_argument("files", nargs="*", default=[],
+                        help="结果文件列表，支持通配符，例如 '../评测结果/*.json'；既没有文件也没有 --db 时使用默认文件")
+    parser.add_argument("--db", default=None, help="SQLite结果库路径，库中所有 (model, stage) 一并分析")
+    parser.add_argument("--mode", choices=["vectorized", "legacy"], default="vectorized",
+                        help="vectorized: 列式加载+向量化分类并计算切片；legacy: 逐条统计")
+    parser.add_argument("--workers", type=int, default=None, help="并行加载的进程数，默认等于CPU核数")
+    parser.add_argument("--cache-dir", default=".analysis_cache",
+                        help="结果文件的列式缓存目录，未变化的文件不再重新解析")
+    parser.add_argument("--no-cache", action="store_true", help="不使用缓存，每次重新解析全部文件")
+    parser.add_argument("--problems", default="../评测数据集/ALL_Problems_250216.json",
+                        help="生成测试数据时使用的题目文件，用于按数据集/题目切片；传空字符串关闭")
+    parser.add_argument("--itsp", default="../评测数据集/ITSP_Problems_250216.json")
+    parser.add_argument("--ybk", default="../评测数据集/YBK_Problems_250216.json")
+    parser.add_argument("--problem-report", default=None, help="逐题通过率CSV导出路径")
+    args = parser.parse_args(argv)
+    if not args.files and not args.db:
+        args.files = DEFAULT_MODEL_FILES
+    return args
+
+def main(argv=None):  
+    args = parse_args(argv)
     console_width = console.width  
     title = Text("LLM多模型对比分析报告", style="bold blue")  
     title.align("center", console_width)  
@@ -140,16 +287,33 @@ def main():
     console.print("\n")  
     
     try:  
-        model_files = [  
-            "fixed_Result_DeepSeek_R1_671B-fix.json",  
-            "fixed_checkpoint_DeepSeek_V3-fix.json",  
-            "Result_Spark_4.0_Ultra-fix.json",
-            "fixed_checkpoint_DeepSeek_R1_Qwen_32B-fix.json",  
-        ]  
-        
+        model_files = expand_paths(args.files)
+        vectorized = args.mode == "vectorized"
+
+        problem_index = None
+        if vectorized and args.problems:
+            problem_index = ProblemIndex.from_problems(args.problems, {"ITSP": args.itsp, "YBK": args.ybk})
+
         all_stats = {}  
-        for file in model_files:  
-            all_stats[file] = load_and_analyze_data(file)  
+        all_columns = {}
+        if vectorized:
+            # 每个文件在独立进程中解析汇总，主进程只接收列式结果和统计
+            cache_dir = None if args.no_cache else args.cache_dir
+            for file, (columns, stats) in load_many(model_files, problem_index, args.workers, cache_dir).items():
+                all_columns[file] = columns
+                all_stats[file] = stats
+        else:
+            for file in model_files:  
+                all_stats[file] = load_and_analyze_data(file)  
+        if args.db and vectorized:
+            store = SQLiteResultStore(args.db)
+            for model, stage in store.runs():
+                key = f"{model}/{stage}"
+                all_columns[key] = ResultColumns.from_store(store, model, stage)
+                all_stats[key] = summarize(all_columns[key], problem_index)
+            store.close()
+        elif args.db:
+            all_stats.update(load_stats_from_db(args.db))
 
         console.print(create_task_info_panel())  
         console.print("")  
@@ -157,15 +321,31 @@ def main():
         console.print(create_comparison_table(all_stats))  
         console.print("")  
 
-        model_names = {  
-            "fixed_Result_DeepSeek_R1_671B-fix.json": "DeepSeek-R1-671B",  
-            "fixed_checkpoint_DeepSeek_V3-fix.json": "DeepSeek-V3",  
-            "Result_Spark_4.0_Ultra-fix.json": "Spark-4.0-Ultra",
-            "fixed_checkpoint_DeepSeek_R1_Qwen_32B-fix.json": "DeepSeek-R1-Qwen-32B", 
-        }  
+        model_names = {key: MODEL_NAMES.get(os.path.basename(key), key) for key in all_stats}
+
+        if any('by_source' in stats for stats in all_stats.values()):
+            console.print(create_slice_table(all_stats, model_names))
+            console.print("")
+        if any('by_difficulty' in stats for stats in all_stats.values()):
+            console.print(create_slice_table(all_stats, model_names, 'by_difficulty', "分难度通过率", "难度"))
+            console.print("")
+
+        # 按 test_id 对齐所有模型的结果；逐题通过率只有一个模型时也输出，一致率需要两个以上模型
+        matrix = ResultMatrix.from_columns(all_columns) if all_columns else None
+        if matrix is not None and len(all_columns) > 1:
+            console.print(create_agreement_table(matrix, model_names))
+            console.print("")
+        if matrix is not None and problem_index is not None:
+            console.print(create_problem_table(matrix, problem_index, model_names))
+            console.print("")
+            if args.problem_report:
+                export_problem_report(matrix, problem_index, model_names, args.problem_report)
+                console.print(f"逐题通过率已导出至: [bold]{args.problem_report}[/bold]")
+        elif args.problem_report:
+            console.print("[yellow]逐题通过率需要 vectorized 模式和 --problems 题目文件，未导出[/yellow]")
         
         for file, stats in all_stats.items():  
-            model_name = model_names[file]  
+            model_name = model_names.get(file, file)
             console.print(create_result_visualization(stats, model_name))  
             console.print("")  
         
@@ -0,0 +1,284 @@
+"""
+评测流程统一入口
+
+    python cli.py generate --input ../评测数据集/ALL_Problems_250216.json --output ../testdata_V3/test_data.json
+    python cli.py convert requests --input ../testdata_V3/test_data.json --output ../Output_jsonl_V3/requests.jsonl
+    python cli.py convert assistants --results ../Results_V3_1/results_v3_5.jsonl \\
+        --problems ../评测数据集/ALL_Problems_250216.json --output ../ALL_Problems_V3/ALL_Problems_v3_5.json
+    python cli.py run --data ../testdata_V3/test_data.json --responses ../Results_V3_1/results_v3_5.jsonl \\
+        --checkpoint ../checkpoint_V3/checkpoint_DeepSeek_V3.json --model DeepSeek-V3 --workers 4
+    python cli.py merge "../checkpoint_V3/checkpoint_DeepSeek_V3.shard-*" -o ../checkpoint_V3/checkpoint_DeepSeek_V3.json
+    python cli.py pack --data ../testdata_V3/test_data.json
+    python cli.py fix --data test_data.json --checkpoint Result_DeepSeek_R1_671B.json \\
+        --responses VolcEngine_batch_response_DeepSeek_R1_671B.jsonl
+    python cli.py analyze [analyze.py 的参数]
+    python cli.py cost --run DeepSeek-V3 stage5 ../Results_V3_1/results_v3_5.jsonl \\
+        ../checkpoint_V3/checkpoint_DeepSeek_V3.json
+
+各子命令只在执行时导入自己用到的模块。
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, Optional
+
+
+def cmd_generate(args) -> int:
+    from generate_data import process_dataset
+    process_dataset(args.input, args.output)
+    return 0
+
+
+def cmd_convert(args) -> int:
+    from utils.dataset import attach_assistants, convert_to_requests
+    if args.kind == "requests":
+        convert_to_requests(args.input, args.output, args.max_prompt_tokens or None, args.max_tokens)
+    else:
+        attach_assistants(args.results, args.problems, args.output)
+    return 0
+
+
+def cmd_run(args, argv: List[str]) -> int:
+    if args.workers > 1 and args.shard is None:
+        return run_workers(args, argv)
+
+    from rich.panel import Panel
+    from utils.checkpoint import shard_checkpoint_path
+    from utils.runner import ModelInferenceRunner, console, setup_logging
+
+    checkpoint_file = shard_checkpoint_path(args.checkpoint, args.shard) if args.shard else args.checkpoint
+    log_listener = setup_logging(prefix=args.log_prefix, console_output=args.console_log)
+
+    console.print(Panel.fit(
+        "[bold green]代码测试系统[/bold green]\n"
+        "支持断点续测和错误恢复",
+        title="Welcome",
+        border_style="blue"
+    ))
+
+    runner = ModelInferenceRunner(
+        args.data,
+        checkpoint_file,
+        response_file=args.responses,
+        request_interval=args.interval,
+        db_path=args.db,
+        stage=args.stage,
+        metrics_port=args.metrics_port,
+        metrics_file=args.metrics_file,
+        timing_events_file=args.timing_events,
+        error_payload_sample_rate=args.error_sample_rate,
+        flush_interval=args.flush_interval,
+        flush_batch=args.flush_batch,
+        journal_file=args.journal,
+        max_attempts=args.max_attempts,
+        shard=args.shard,
+        extract_policy=args.extract_policy,
+        precheck=args.precheck,
+        precheck_workers=args.precheck_workers,
+        dedup=not args.no_dedup,
+        max_prompt_tokens=args.max_prompt_tokens or None,
+        judge=args.judge,
+        case_pack=args.case_pack,
+        compare_mode=args.compare,
+        spj_workers=args.spj_workers,
+        spj_cache_dir=args.spj_cache_dir
+    )
+
+    try:
+        runner.run_inference(start_id=args.start, end_id=args.end, model=args.model)
+    except KeyboardInterrupt:
+        console.print("\n[yellow]用户中断执行[/yellow]")
+        runner.display_statistics()
+        return 130
+    except Exception as e:
+        console.print(f"\n[red]执行过程中出现错误: {str(e)}[/red]")
+        return 1
+    finally:
+        console.print("\n[bold green]测试任务结束[/bold green]")
+        log_listener.stop()
+    return 0
+
+
+def run_workers(args, argv: List[str]) -> int:
+    """
+    在本机启动 workers 个评测子进程
+
+    SQLite 模式下所有子进程写同一个库，由工作状态日志分配测试点；
+    JSON checkpoint 模式下先把 --checkpoint 中各分片缺少的记录补入分片文件，每个子进程评测一个分片，
+    全部结束后连同 --checkpoint 原有的记录一起合并回 --checkpoint（分片评测失败时原有记录不会丢失）。
+    """
+    from utils.checkpoint import merge_checkpoints, split_checkpoint
+
+    base = [sys.executable, os.path.abspath(__file__), *argv, "--workers", "1"]
+    if args.db:
+        commands = [base for _ in range(args.workers)]
+        shard_files = []
+    else:
+        shard_files = split_checkpoint(args.checkpoint, args.workers)
+        commands = [base + ["--shard", f"{index}/{args.workers}"] for index in range(args.workers)]
+
+    processes = [subprocess.Popen(command) for command in commands]
+    try:
+        codes = [process.wait() for process in processes]
+    except KeyboardInterrupt:
+        # Ctrl+C 同时发给了子进程，等它们写完各自的结果
+        codes = [process.wait() for process in processes]
+
+    if shard_files:
+        shard_files = [path for path in shard_files if os.path.exists(path)]
+        inputs = [args.checkpoint] + shard_files if os.path.exists(args.checkpoint) else shard_files
+        summary = merge_checkpoints(inputs, args.checkpoint)
+        print(f"已合并 {len(shard_files)} 个分片, 共 {summary['records']} 条记录 -> {args.checkpoint}")
+    return max(codes, default=0)
+
+
+def cmd_pack(args) -> int:
+    from utils.oj_runner.case_pack import build_case_pack, case_pack_path
+    output = args.output or case_pack_path(args.data)
+    groups = build_case_pack(args.data, output)
+    print(f"已写入 {groups} 组测试用例 -> {output}")
+    return 0
+
+
+def cmd_merge(args) -> int:
+    from utils.checkpoint import expand_shard_files, merge_checkpoints
+    summary = merge_checkpoints(expand_shard_files(args.shard_files, args.output), args.output)
+    print(f"合并完成! {summary['shards']} 个分片, 共 {summary['records']} 条记录"
+          f"（重复 {summary['duplicates']} 条） -> {args.output}")
+    return 0
+
+
+def cmd_fix(args) -> int:
+    from fix_test_deepseek import CheckpointFixer, get_console
+    fixer = CheckpointFixer(
+        test_data_file=args.data,
+        checkpoint_file=args.checkpoint,
+        response_file=args.responses,
+        output_file=args.output,
+        db_path=args.db,
+        model=args.model,
+        stage=args.stage
+    )
+    try:
+        fixer.fix_checkpoint()
+    except Exception as e:
+        get_console().print(f"[red]修复过程中出现错误: {str(e)}[/red]")
+        return 1
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from utils.checkpoint.shard import parse_shard
+    from utils.dataset.tokens import MAX_PROMPT_TOKENS
+    from utils.solution import POLICIES
+    from utils.oj_runner.compare import DEFAULT_MODE as DEFAULT_COMPARE_MODE, MODES as COMPARE_MODES
+
+    parser = argparse.ArgumentParser(description="代码修复评测流程")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate = subparsers.add_parser("generate", help="由题目数据生成测试数据")
+    generate.add_argument("--input", required=True, help="题目数据（含 submissions 和 test_case）")
+    generate.add_argument("--output", required=True, help="输出的测试数据文件")
+
+    convert = subparsers.add_parser("convert", help="生成批量推理请求 / 把推理结果写回题目文件")
+    convert_kinds = convert.add_subparsers(dest="kind", required=True)
+    to_requests = convert_kinds.add_parser("requests", help="测试数据 -> 批量推理请求 JSONL")
+    to_requests.add_argument("--input", required=True)
+    to_requests.add_argument("--output", required=True)
+    to_requests.add_argument("--max-prompt-tokens", type=int, default=MAX_PROMPT_TOKENS,
+                             help="超过该 token 数的提示词被忽略，0 表示不限制")
+    to_requests.add_argument("--max-tokens", type=int, default=8192)
+    assistants = convert_kinds.add_parser("assistants", help="批量推理结果 -> 题目文件的 assistant 字段")
+    assistants.add_argument("--results", required=True)
+    assistants.add_argument("--problems", required=True)
+    assistants.add_argument("--output", required=True)
+
+    run = subparsers.add_parser("run", help="评测模型生成的代码")
+    run.add_argument("--data", required=True, help="测试数据文件")
+    run.add_argument("--responses", default=None, help="批量推理结果 JSONL；不指定时在线调用 --model")
+    run.add_argument("--checkpoint", required=True, help="checkpoint 路径（--db 模式下只用于定位共享表）")
+    run.add_argument("--model", required=True, help="结果中记录的模型名；在线模式下 ark 为火山方舟，其余为讯飞星火")
+    run.add_argument("--start", type=int, default=1)
+    run.add_argument("--end", type=int, default=None)
+    run.add_argument("--db", default=None, help="结果写入 SQLite 库")
+    run.add_argument("--stage", default="default")
+    run.add_argument("--shard", type=parse_shard, default=None, help="只评测第 i 个分片（i/N，i 从 0 开始）")
+    run.add_argument("--workers", type=int, default=1, help="本机并行的评测进程数")
+    run.add_argument("--interval", type=float, default=1.0, help="两个测试点之间的间隔（秒）")
+    run.add_argument("--max-prompt-tokens", type=int, default=MAX_PROMPT_TOKENS,
+                     help="跳过超过该 token 数的提示词，0 表示不限制")
+    run.add_argument("--max-attempts", type=int, default=3, help="可重试错误的最大尝试次数")
+    run.add_argument("--extract-policy", choices=POLICIES, default="last",
+                     help="响应中有多个 C 代码块时选哪一个")
+    run.add_argument("--judge", choices=["oj", "local"], default="oj",
+                     help="oj 提交评测机；local 用本机 gcc 编译运行（无沙箱，仅用于隔离环境）")
+    run.add_argument("--compare", choices=COMPARE_MODES, default=DEFAULT_COMPARE_MODE,
+                     help="本地评测的输出比较方式：exact 逐字节，rstrip 忽略末尾空白，whitespace 按记号，float 记号数值容差")
+    run.add_argument("--case-pack", default=None,
+                     help="测试用例二进制包，默认使用测试数据旁的 .cases.pack；指定的文件不存在时自动生成")
+    run.add_argument("--spj-workers", type=int, default=4, help="提前编译特判程序的并发数")
+    run.add_argument("--spj-cache-dir", default=None,
+                     help="本地评测时特判程序可执行文件的缓存目录，默认为测试数据旁的 .spj 目录")
+    run.add_argument("--precheck", action="store_true", help="提交评测机前先用本机 gcc -fsyntax-only 检查")
+    run.add_argument("--precheck-workers", type=int, default=4, help="本地预检查的并发数")
+    run.add_argument("--no-dedup", action="store_true", help="同题目下归一化相同的代码也逐个提交评测机")
+    run.add_argument("--journal", default=None, help="工作状态日志路径，默认与 checkpoint / 结果库同目录")
+    run.add_argument("--flush-interval", type=float, default=2.0, help="后台写线程最长攒批时间（秒）")
+    run.add_argument("--flush-batch", type=int, default=50, help="后台写线程每批最多记录数")
+    run.add_argument("--metrics-port", type=int, default=None, help="在本地端口暴露 /metrics")
+    run.add_argument("--metrics-file", default=None, help="定期写入指标文件")
+    run.add_argument("--timing-events", default=None, help="逐条阶段耗时事件 JSONL")
+    run.add_argument("--error-sample-rate", type=float, default=0.0, help="错误日志中附带完整上下文的比例")
+    run.add_argument("--log-prefix", default="inference", help="日志文件名前缀")
+    run.add_argument("--console-log", action="store_true", help="日志同时输出到终端")
+
+    pack = subparsers.add_parser("pack", help="由测试数据生成测试用例二进制包")
+    pack.add_argument("--data", required=True, help="测试数据文件")
+    pack.add_argument("-o", "--output", default=None, help="默认与测试数据同目录的 .cases.pack")
+
+    merge = subparsers.add_parser("merge", help="合并分片 checkpoint")
+    merge.add_argument("shard_files", nargs="+", help="分片 checkpoint 文件，支持通配符")
+    merge.add_argument("-o", "--output", required=True)
+
+    fix = subparsers.add_parser("fix", help="从批量推理结果中补全 checkpoint 缺失的测试点")
+    fix.add_argument("--data", required=True)
+    fix.add_argument("--checkpoint", required=True)
+    fix.add_argument("--responses", required=True)
+    fix.add_argument("--output", default=None)
+    fix.add_argument("--db", default=None)
+    fix.add_argument("--model", default="DeepSeek-R1-Qwen-32B")
+    fix.add_argument("--stage", default="default")
+
+    subparsers.add_parser("analyze", help="多模型对比分析（其余参数原样传给 analyze.py）", add_help=False)
+    subparsers.add_parser("cost", help="按 usage 字段统计 token 用量和每个通过测试点的费用", add_help=False)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv[:1] == ["analyze"]:
+        import analyze
+        analyze.main(argv[1:])
+        return 0
+    if argv[:1] == ["cost"]:
+        from utils.analysis.cost import main as cost_main
+        cost_main(argv[1:])
+        return 0
+
+    args = build_parser().parse_args(argv)
+    if args.command == "generate":
+        return cmd_generate(args)
+    if args.command == "convert":
+        return cmd_convert(args)
+    if args.command == "run":
+        return cmd_run(args, argv)
+    if args.command == "merge":
+        return cmd_merge(args)
+    if args.command == "pack":
+        return cmd_pack(args)
+    return cmd_fix(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
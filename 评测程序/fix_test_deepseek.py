@@ -1,25 +1,45 @@
 import json
 from datetime import datetime
-from typing import Dict, List
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
+from functools import lru_cache
+from typing import Dict, List, Optional
+from utils.checkpoint import SQLiteResultStore, TestCaseTable, side_table_path
+from utils.dataset.records import load_test_data
 
-console = Console()
+
+@lru_cache(maxsize=None)
+def get_console():
+    """rich 控制台，第一次输出时才导入 rich"""
+    from rich.console import Console
+    return Console()
 
 
 class CheckpointFixer:
     def __init__(self,
                  test_data_file: str,
-                 checkpoint_file: str,
+                 checkpoint_file: Optional[str],
                  response_file: str,
-                 output_file: str = None):
+                 output_file: str = None,
+                 db_path: Optional[str] = None,
+                 model: str = "DeepSeek-R1-Qwen-32B",
+                 stage: str = "default"):
         self.test_data_file = test_data_file
         self.checkpoint_file = checkpoint_file
         self.response_file = response_file
-        self.output_file = output_file or f"fixed_{checkpoint_file}"
-
-        self.test_data = self._load_json(test_data_file)
-        self.checkpoint = self._load_json(checkpoint_file)
+        self.model = model
+        self.stage = stage
+        # 指定db_path时直接在SQLite库中补全缺失记录，不再读写checkpoint文件
+        self.store = SQLiteResultStore(db_path) if db_path else None
+        # 数据库模式下测试用例写入库中的 test_cases 表，没有输出文件和共享表文件
+        self.output_file = None if self.store is not None else output_file or f"fixed_{checkpoint_file}"
+
+        self.test_data = load_test_data(test_data_file)
+        self.test_case_table = TestCaseTable(side_table_path(self.output_file) if self.output_file else None)
+        if self.store is None:
+            self.checkpoint = self._load_json(checkpoint_file)
+            self.test_case_table.merge(TestCaseTable(side_table_path(checkpoint_file)))
+            self.test_case_table.compact(self.checkpoint)
+        else:
+            self.checkpoint = {}
         self.responses = self._load_response_data()
 
     def _load_json(self, file_path: str) -> Dict:
@@ -38,7 +58,7 @@ class CheckpointFixer:
                         content = record["response"]["body"]["choices"][0]["message"]["content"]
                         responses[test_id] = content
         except Exception as e:
-            console.print(f"[red]加载响应文件失败: {str(e)}[/red]")
+            get_console().print(f"[red]加载响应文件失败: {str(e)}[/red]")
             raise
         return responses
 
@@ -50,22 +70,25 @@ class CheckpointFixer:
             'message': "代码提取失败",
             'code': None,
             'response': response,
-            'model': "DeepSeek-R1-Qwen-32B",  # 根据实际情况修改
-            'prompt': test_case['test_prompt'],
-            'test_case': test_case['test_case']
+            'model': self.model,
+            'test_case_ref': self.test_case_table.add(test_case['test_case'])
         }
 
     def fix_checkpoint(self):
-        console.print("[bold green]开始修复checkpoint文件...[/bold green]")
+        get_console().print("[bold green]开始修复checkpoint文件...[/bold green]")
 
         missing_count = 0
-        fixed_checkpoint = self.checkpoint.copy()
+        completed = (self.store.completed_ids(self.model, self.stage)
+                     if self.store is not None else self.checkpoint)
+        missing_entries = {}
+
+        from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn
 
         with Progress(
                 SpinnerColumn(),
                 TextColumn("[progress.description]{task.description}"),
                 BarColumn(),
-                console=console
+                console=get_console()
         ) as progress:
             task = progress.add_task("[cyan]检查缺失的测试点...", total=len(self.test_data))
 
@@ -74,25 +97,34 @@ class CheckpointFixer:
                 progress.update(task, advance=1)
 
                 # 如果测试点不在checkpoint中
-                if test_id not in fixed_checkpoint:
+                if test_id not in completed:
                     # 检查是否有对应的响应
                     if int(test_id) in self.responses:
                         response = self.responses[int(test_id)]
                         # 创建错误记录
-                        fixed_checkpoint[test_id] = self._create_error_entry(
+                        missing_entries[test_id] = self._create_error_entry(
                             int(test_id),
                             test_case,
                             response
                         )
                         missing_count += 1
 
-                        # 保存修复后的checkpoint
+        get_console().print(f"[bold green]修复完成！[/bold green]")
+        get_console().print(f"添加了 [bold cyan]{missing_count}[/bold cyan] 个缺失的测试点")
+
+        if self.store is not None:
+            self.store.upsert_many(self.model, self.stage, missing_entries)
+            refs = {entry['test_case_ref'] for entry in missing_entries.values()}
+            self.store.save_test_cases({ref: self.test_case_table.get(ref) for ref in refs})
+            get_console().print(f"缺失记录已写入数据库: [bold]{self.store.db_path}[/bold]")
+            return
+
+        # 保存修复后的checkpoint及测试用例共享表
+        fixed_checkpoint = {**self.checkpoint, **missing_entries}
+        self.test_case_table.save()
         with open(self.output_file, 'w', encoding='utf-8') as f:
             json.dump(fixed_checkpoint, f, ensure_ascii=False, indent=2)
-
-        console.print(f"[bold green]修复完成！[/bold green]")
-        console.print(f"添加了 [bold cyan]{missing_count}[/bold cyan] 个缺失的测试点")
-        console.print(f"修复后的文件已保存至: [bold]{self.output_file}[/bold]")
+        get_console().print(f"修复后的文件已保存至: [bold]{self.output_file}[/bold]")
 
 
 def main():
@@ -105,7 +137,7 @@ def main():
     try:
         fixer.fix_checkpoint()
     except Exception as e:
-        console.print(f"[red]修复过程中出现错误: {str(e)}[/red]")
+        get_console().print(f"[red]修复过程中出现错误: {str(e)}[/red]")
 
 
 if __name__ == "__main__":
@@ -1,6 +1,10 @@
 import json
 from typing import List, Dict, Any
 from jinja2 import Template
+from utils.checkpoint import compute_test_case_ref
+from utils.dataset.records import problem_table_path, write_test_data
+from utils.oj_runner.case_pack import case_pack_path, write_case_pack
+from utils.dataset.tokens import count_tokens, has_tokenizer
 
 # 定义提示词模板
 PROMPT_TEMPLATE = """
@@ -26,16 +30,24 @@ def process_dataset(input_file: str, output_file: str):
         data = json.load(f)
     
     test_cases: List[Dict[str, Any]] = []
+    # 题目表：测试用例和题面每道题只保存一份，测试数据中的记录通过 problem_id 引用
+    problems: Dict[str, Dict[str, Any]] = {}
     test_id = 1
     
-    # 处理每个题目
-    for problem in data:
+    # 处理每个题目（problem_id 为题目在输入文件中的序号）
+    for problem_id, problem in enumerate(data):
         # 检查是否有测试用例
         if not problem.get('test_case'):
             continue
             
         problem_content = problem['content']
-        test_cases_data = problem['test_case']
+        problems[str(problem_id)] = {
+            'content': problem_content,
+            'test_case': problem['test_case']
+        }
+        # 多解题目带特判程序（spj_code），评测时由特判程序判定输出是否正确
+        if problem.get('spj_code'):
+            problems[str(problem_id)]['spj_code'] = problem['spj_code']
         
         # 处理每个错误提交
         for submission in problem['submissions']:
@@ -49,21 +61,26 @@ def process_dataset(input_file: str, output_file: str):
                 code_language="C"
             )
             
-            # 创建测试用例对象
+            # 创建测试用例对象；token 数只在这里计算一次，后续阶段按该字段过滤
             test_case = {
                 'test_id': test_id,
-                'test_case': test_cases_data,
-                'test_prompt': prompt
+                'problem_id': str(problem_id),
+                'test_prompt': prompt,
+                'prompt_tokens': count_tokens(prompt)
             }
+            # 未安装 tiktoken 时只是估算值，打上标记，运行时能精确分词再重新计算
+            if not has_tokenizer():
+                test_case['prompt_tokens_estimated'] = True
             
             test_cases.append(test_case)
             test_id += 1
     
-    # 保存处理后的数据
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(test_cases, f, ensure_ascii=False, indent=2)
+    # 保存处理后的数据和题目表，同时生成评测用的测试用例二进制包
+    write_test_data(output_file, test_cases, problems)
+    write_case_pack(case_pack_path(output_file),
+                    ((compute_test_case_ref(problem['test_case']), problem['test_case']) for problem in problems.values()))
     
-    print(f"处理完成! 共生成 {len(test_cases)} 个测试用例")
+    print(f"处理完成! 共生成 {len(test_cases)} 个测试用例，{len(problems)} 道题目 -> {problem_table_path(output_file)}")
 
 if __name__ == "__main__":
     # 使用示例
@@ -1,67 +1,213 @@
-import json  
-import tiktoken  
-import numpy as np  
-from tqdm import tqdm  
-
-def num_tokens_from_messages(messages, model="gpt-3.5-turbo-0613"):  
-    """计算消息列表中的token数量"""  
-    encoding = tiktoken.encoding_for_model(model)  
-    tokens_per_message = 3  # 每条消息的基础token数  
-    tokens_per_name = 1     # 每个名字的基础token数  
-    
-    num_tokens = 0  
-    for message in messages:  
-        num_tokens += tokens_per_message  
-        for key, value in message.items():  
-            num_tokens += len(encoding.encode(str(value)))  
-            if key == "name":  
-                num_tokens += tokens_per_name  
-    num_tokens += 3  # 每个回复的基础token数  
-    return num_tokens  
-
-def estimate_tokens_for_dataset(input_file):  
-    """估算整个数据集的token使用量"""  
-    # 读取输入JSON文件  
-    with open(input_file, 'r', encoding='utf-8') as f:  
-        data = json.load(f)  
-    
-    # 用于存储统计信息  
-    token_counts = []  
-    total_tokens = 0  
-    request_counts = 0  
-    
-    print("正在估算token数量...")  
-    for item in tqdm(data):  
-        # 估算第一种请求格式的token数  
-        messages1 = [  
-            {"role": "user", "content": item['test_prompt']}  
-        ]  
-        tokens1 = num_tokens_from_messages(messages1)  
-        
-        token_counts.extend([tokens1])  
-        total_tokens += tokens1
-        request_counts += 1
-    
-    # 计算统计信息  
-    avg_tokens = np.mean(token_counts)  
-    std_tokens = np.std(token_counts)  
-    min_tokens = np.min(token_counts)  
-    max_tokens = np.max(token_counts)  
-    
-    # 计算成本估算（使用DeepSeek-R1的价格）  
-    cost_per_1k_tokens = 0.002  # 0.002 ￥ per 1K tokens  
-    estimated_cost = (total_tokens / 1000) * cost_per_1k_tokens  
-    
-    print("\n=== Token 使用估算报告 ===")  
-    print(f"总发送请求数: {request_counts}")  
-    print(f"总发送 token 数: {total_tokens:,}")  
-    print(f"平均每个发送请求 token 数: {avg_tokens:.2f}")  
-    print(f"发送 token 数标准差: {std_tokens:.2f}")  
-    print(f"最小发送 token 数: {min_tokens}")  
-    print(f"最大发送 token 数: {max_tokens}")  
-    print(f"\n估计总成本（发送+推理+响应）: ￥{4 * estimated_cost:.2f}") 
-    return total_tokens, stats  
-
-if __name__ == "__main__":  
-    # pip install tiktoken numpy tqdm  
-    total_tokens, stats = estimate_tokens_for_dataset('test_data.json')
\ No newline at end of file
+"""
+统计测试数据（请求）和批量推理结果（响应）的 token 数
+
+    python token_calculate.py --data ../testdata_V3/test_data.json
+    python token_calculate.py --data V3=../testdata_V3/test_data.json R1=../testdata_R1/test_R1_2.json \\
+        --responses stage5=../Results_V3_1/results_v3_5.jsonl --workers 8
+
+每个输入可以写成 名称=路径，报告中按名称（数据集/阶段）分别汇总。
+测试数据中已有 prompt_tokens 字段（generate_data 生成时写入）的直接使用，带 prompt_tokens_estimated
+标记（生成时未安装 tiktoken）的重新分词；
+响应中有 usage 字段的直接使用，否则才对响应内容分词。
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from tqdm import tqdm
+
+from utils.dataset.records import iter_test_data
+from utils.dataset.tokens import TOKENIZER_MODEL, count_tokens, get_encoding
+
+TOKENS_PER_MESSAGE = 3  # 每条消息的基础token数
+TOKENS_PER_NAME = 1     # 每个名字的基础token数
+TOKENS_PER_REPLY = 3    # 每个回复的基础token数
+PERCENTILES = (50, 90, 99)
+BATCH_SIZE = 256
+
+
+def num_tokens_from_messages(messages, model=TOKENIZER_MODEL):
+    """计算消息列表中的token数量"""
+    num_tokens = 0
+    for message in messages:
+        num_tokens += TOKENS_PER_MESSAGE
+        for key, value in message.items():
+            num_tokens += count_tokens(str(value), model)
+            if key == "name":
+                num_tokens += TOKENS_PER_NAME
+    num_tokens += TOKENS_PER_REPLY
+    return num_tokens
+
+
+def count_batch(texts: List[str]) -> List[int]:
+    """子进程中批量分词（编码器按进程缓存）"""
+    encoding = get_encoding(TOKENIZER_MODEL)
+    if encoding is None:
+        return [count_tokens(text) for text in texts]
+    return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def count_texts(texts: Iterable[str], pool: Optional[ProcessPoolExecutor]) -> Iterator[int]:
+    """按批分词，有进程池时并行（map 按批次顺序返回）"""
+    batches = batched(texts, BATCH_SIZE)
+    results = pool.map(count_batch, batches) if pool is not None else map(count_batch, batches)
+    for counts in results:
+        yield from counts
+
+
+def iter_responses(file_path: str) -> Iterator[Dict]:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def request_tokens(file_path: str, pool: Optional[ProcessPoolExecutor]) -> np.ndarray:
+    """每个请求（单条 user 消息）的 token 数"""
+    overhead = TOKENS_PER_MESSAGE + count_tokens("user") + TOKENS_PER_REPLY
+    counts: List[int] = []
+    pending: List[str] = []
+
+    def flush():
+        counts.extend(count + overhead for count in count_texts(pending, pool))
+        pending.clear()
+
+    for item in tqdm(iter_test_data(file_path), desc=os.path.basename(file_path), unit="条"):
+        if item.get('prompt_tokens') is not None and not item.get('prompt_tokens_estimated'):
+            counts.append(int(item['prompt_tokens']) + overhead)
+        else:
+            pending.append(item['test_prompt'])
+            if len(pending) >= BATCH_SIZE * 16:
+                flush()
+    flush()
+    return np.array(counts, dtype=np.int64)
+
+
+def response_tokens(file_path: str, pool: Optional[ProcessPoolExecutor]) -> Dict[str, np.ndarray]:
+    """
+    每个成功响应的 prompt / completion / reasoning token 数
+
+    prompt / completion / reasoning 三列只统计有 usage 字段的响应，逐行对应；
+    没有 usage 的响应按内容（含 reasoning_content）分词估算 completion，单独放在 estimated 列。
+    """
+    columns: Dict[str, List[int]] = {"prompt": [], "completion": [], "reasoning": []}
+    estimated: List[str] = []
+    for record in tqdm(iter_responses(file_path), desc=os.path.basename(file_path), unit="条"):
+        if record.get("error") is not None:
+            continue
+        body = record["response"]["body"]
+        usage = body.get("usage")
+        if usage:
+            details = usage.get("completion_tokens_details") or {}
+            columns["prompt"].append(usage.get("prompt_tokens", 0))
+            columns["completion"].append(usage.get("completion_tokens", 0))
+            columns["reasoning"].append(details.get("reasoning_tokens", 0))
+        else:
+            message = body["choices"][0]["message"]
+            estimated.append((message.get("reasoning_content") or "") + (message.get("content") or ""))
+    columns["estimated"] = list(count_texts(estimated, pool))
+    return {name: np.array(values, dtype=np.int64) for name, values in columns.items()}
+
+
+def describe(counts: np.ndarray) -> Dict:
+    if not len(counts):
+        return {"count": 0, "total": 0}
+    stats = {
+        "count": int(len(counts)),
+        "total": int(counts.sum()),
+        "mean": float(counts.mean()),
+        "std": float(counts.std()),
+        "min": int(counts.min()),
+        "max": int(counts.max()),
+    }
+    for p, value in zip(PERCENTILES, np.percentile(counts, PERCENTILES)):
+        stats[f"p{p}"] = float(value)
+    return stats
+
+
+def format_stats(stats: Dict) -> str:
+    if not stats["count"]:
+        return "0 条"
+    percentiles = " ".join(f"P{p} {stats[f'p{p}']:.0f}" for p in PERCENTILES)
+    return (f"{stats['count']} 条, 共 {stats['total']:,}, 平均 {stats['mean']:.1f} ± {stats['std']:.1f}, "
+            f"最小 {stats['min']}, {percentiles}, 最大 {stats['max']}")
+
+
+def parse_inputs(specs: List[str]) -> List[Tuple[str, str]]:
+    """名称=路径；不写名称时用文件名"""
+    inputs = []
+    for spec in specs:
+        name, sep, path = spec.partition("=")
+        if not sep:
+            name, path = os.path.splitext(os.path.basename(spec))[0], spec
+        inputs.append((name, path))
+    return inputs
+
+
+def estimate_tokens_for_dataset(input_file, workers: int = 1, pool: Optional[ProcessPoolExecutor] = None):
+    """估算整个数据集的token使用量，返回 (总token数, 统计信息)"""
+    if pool is None and workers > 1:
+        with ProcessPoolExecutor(workers) as own_pool:
+            return estimate_tokens_for_dataset(input_file, pool=own_pool)
+    stats = describe(request_tokens(input_file, pool))
+    return stats["total"], stats
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="统计请求和响应的 token 数")
+    parser.add_argument("--data", nargs="*", default=[], help="测试数据文件（名称=路径）")
+    parser.add_argument("--responses", nargs="*", default=[], help="批量推理结果 JSONL（名称=路径）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="分词进程数，1 表示不用进程池")
+    parser.add_argument("--price-per-1k", type=float, default=0.002, help="每千 token 价格（￥），用于粗略估算成本")
+    args = parser.parse_args(argv)
+    if not args.data and not args.responses:
+        args.data = ["test_data.json"]
+
+    pool = ProcessPoolExecutor(args.workers) if args.workers > 1 else None
+    try:
+        report = {}
+        for name, path in parse_inputs(args.data):
+            total_tokens, stats = estimate_tokens_for_dataset(path, pool=pool)
+            report[f"requests:{name}"] = stats
+            print(f"\n=== 请求 [{name}] ===")
+            print(format_stats(stats))
+            # 发送+推理+响应按发送量的 4 倍粗略估算
+            print(f"估计总成本（发送+推理+响应）: ￥{4 * total_tokens / 1000 * args.price_per_1k:.2f}")
+
+        for name, path in parse_inputs(args.responses):
+            columns = response_tokens(path, pool)
+            estimated = columns.pop("estimated")
+            report[f"responses:{name}"] = {column: describe(values) for column, values in columns.items()}
+            report[f"responses:{name}"]["estimated_completion"] = describe(estimated)
+            print(f"\n=== 响应 [{name}] ===（有 usage 字段 {len(columns['prompt'])} 条）")
+            for column, values in columns.items():
+                print(f"{column:>10}: {format_stats(describe(values))}")
+            # completion_tokens 已包含 reasoning_tokens；只统计有 usage 的响应
+            total = int(columns["prompt"].sum() + columns["completion"].sum())
+            print(f"实际成本（prompt+completion）: ￥{total / 1000 * args.price_per_1k:.2f}")
+            if len(estimated):
+                # 没有 usage 的响应只能估算 completion，prompt 未计入，不与实际成本相加
+                print(f"没有 usage 字段 {len(estimated)} 条，按内容估算 completion: {format_stats(describe(estimated))}")
+                print(f"估算成本（仅 completion）: ￥{int(estimated.sum()) / 1000 * args.price_per_1k:.2f}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return report
+
+
+if __name__ == "__main__":
+    # pip install tiktoken numpy tqdm（可选 ijson 流式读取大文件）
+    main()
@@ -0,0 +1,10 @@
+from .cache import AnalysisCache
+from .cost import UsageColumns, cost_summary
+from .columns import ResultColumns, classify_vectorized, iter_checkpoint_items
+from .engine import summarize
+from .join import ResultMatrix
+from .parallel import expand_paths, load_many
+from .problem_index import ProblemIndex
+
+__all__ = ['AnalysisCache', 'ResultColumns', 'classify_vectorized', 'iter_checkpoint_items', 'summarize',
+           'ResultMatrix', 'ProblemIndex', 'expand_paths', 'load_many', 'UsageColumns', 'cost_summary']
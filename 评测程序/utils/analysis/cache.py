@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+from typing import BinaryIO, Dict, Optional, Tuple
+
+import numpy as np
+
+from .columns import ResultColumns
+
+# 读取文件末尾多少字节来定位最后一条记录的结束位置
+TAIL_PROBE_BYTES = 256
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def _body_end(f, size: int) -> Optional[int]:
+    """
+    返回 JSON 对象中最后一条记录结束的位置（去掉结尾的 "}" 和空白）
+
+    json.dump 写出的 checkpoint 在追加记录后，旧文件的这一段内容保持不变，
+    新记录只会出现在它之后。
+    """
+    start = max(0, size - TAIL_PROBE_BYTES)
+    f.seek(start)
+    tail = f.read(size - start).rstrip()
+    if not tail.endswith(b"}"):
+        return None
+    return start + len(tail[:-1].rstrip())
+
+
+def _update_hash(hasher, f, start: int, end: int) -> None:
+    f.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        chunk = f.read(min(HASH_CHUNK_BYTES, remaining))
+        if not chunk:
+            break
+        hasher.update(chunk)
+        remaining -= len(chunk)
+
+
+class AnalysisCache:
+    """
+    结果文件的列式缓存
+
+    以文件路径为键保存 ResultColumns，按 (size, mtime) 判断是否命中；
+    文件只是在末尾追加了记录（评测进行中的 checkpoint）时，只解析新增部分并合并，
+    不必重新解析整个文件。
+
+    评测进行中 checkpoint 会被原子替换，因此一次加载只打开文件一次：
+    stat、解析和哈希都针对同一个文件句柄，元数据和列始终来自同一版本。
+    """
+
+    def __init__(self, cache_dir: str = ".analysis_cache"):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, path: str) -> Tuple[str, str]:
+        key = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:16]
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.json", f"{base}.npz"
+
+    def _read(self, path: str) -> Tuple[Optional[Dict], Optional[ResultColumns]]:
+        meta_path, data_path = self._paths(path)
+        if not (os.path.exists(meta_path) and os.path.exists(data_path)):
+            return None, None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with np.load(data_path) as data:
+            columns = ResultColumns(data['test_ids'], data['passed'], data['error_codes'], meta['models'])
+        return meta, columns
+
+    def _write(self, path: str, meta: Dict, columns: ResultColumns) -> None:
+        meta_path, data_path = self._paths(path)
+        meta = dict(meta, path=os.path.abspath(path), models=columns.models)
+        with open(f"{data_path}.tmp", 'wb') as f:
+            np.savez(f, test_ids=columns.test_ids, passed=columns.passed, error_codes=columns.error_codes)
+        os.replace(f"{data_path}.tmp", data_path)
+        with open(f"{meta_path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+    def _read_appended(self, f: BinaryIO, meta: Dict, size: int) -> Optional[Tuple[Dict, Dict]]:
+        """文件仅在末尾追加了记录时返回 (新增记录, 新的元数据)，否则返回 None"""
+        if meta.get('body_end') is None:
+            return None
+        hasher = hashlib.sha1()
+        _update_hash(hasher, f, 0, meta['body_end'])
+        if hasher.hexdigest() != meta['prefix_sha1']:
+            return None
+        body_end = _body_end(f, size)
+        if body_end is None or body_end < meta['body_end']:
+            return None
+        f.seek(meta['body_end'])
+        appended = f.read(body_end - meta['body_end'])
+        _update_hash(hasher, f, meta['body_end'], body_end)
+
+        appended = appended.decode('utf-8').strip()
+        if appended.startswith(","):
+            appended = appended[1:]
+        try:
+            records = json.loads("{" + appended + "}")
+        except ValueError:
+            return None
+        return records, {'body_end': body_end, 'prefix_sha1': hasher.hexdigest()}
+
+    def _full_meta(self, f: BinaryIO, size: int) -> Dict:
+        body_end = _body_end(f, size)
+        if body_end is None:
+            return {'body_end': None, 'prefix_sha1': None}
+        hasher = hashlib.sha1()
+        _update_hash(hasher, f, 0, body_end)
+        return {'body_end': body_end, 'prefix_sha1': hasher.hexdigest()}
+
+    def load_columns(self, path: str) -> ResultColumns:
+        """读取结果文件的列式表示，尽量复用缓存"""
+        meta, cached = self._read(path)
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            file_meta = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+            if meta is not None and meta['size'] == stat.st_size and meta['mtime_ns'] == stat.st_mtime_ns:
+                return cached
+
+            if meta is not None and stat.st_size > meta['size']:
+                appended = self._read_appended(f, meta, stat.st_size)
+                if appended is not None:
+                    records, tail_meta = appended
+                    columns = ResultColumns.concat(cached, ResultColumns.from_items(records.items()))
+                    self._write(path, {**file_meta, **tail_meta}, columns)
+                    return columns
+
+            full_meta = self._full_meta(f, stat.st_size)
+            f.seek(0)
+            columns = ResultColumns.from_file(f)
+        self._write(path, {**file_meta, **full_meta}, columns)
+        return columns
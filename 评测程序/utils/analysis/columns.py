@@ -0,0 +1,105 @@
+import json
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+try:
+    import ijson
+except ImportError:  # 未安装 ijson 时退化为整体 json.load
+    ijson = None
+
+from ..checkpoint.classify import ERROR_LABELS
+
+# 错误类型编码：列中用 int8 存储，-1 表示通过
+ERROR_TYPES = list(ERROR_LABELS)
+PASSED_CODE = -1
+# 分类只需要评测信息的第一行（"Test case 1 failed: Wrong Answer" 等），不保留完整输出
+MESSAGE_HEAD_CHARS = 128
+
+
+def iter_file_items(f: BinaryIO) -> Iterator[Tuple[str, Dict]]:
+    """从已打开的 checkpoint 文件（二进制模式）逐条读取 (test_id, record)，安装了 ijson 时流式解析"""
+    if ijson is not None:
+        yield from ijson.kvitems(f, '')
+    else:
+        yield from json.load(f).items()
+
+
+def iter_checkpoint_items(file_path: str) -> Iterator[Tuple[str, Dict]]:
+    """逐条读取 checkpoint 中的 (test_id, record)"""
+    with open(file_path, 'rb') as f:
+        yield from iter_file_items(f)
+
+
+def message_head(message) -> str:
+    if not message:
+        return ""
+    return message[:MESSAGE_HEAD_CHARS].split("\n", 1)[0]
+
+
+def classify_vectorized(passed: np.ndarray, heads: List[str]) -> np.ndarray:
+    """对整列评测信息做失败分类，规则与 classify_failure 相同"""
+    heads = np.array(heads, dtype=str)
+    codes = np.full(len(passed), ERROR_TYPES.index("other"), dtype=np.int8)
+    if len(heads):
+        codes[np.char.find(heads, "Wrong Answer") >= 0] = ERROR_TYPES.index("wrong_answer")
+        codes[np.char.find(heads, "Runtime Error") >= 0] = ERROR_TYPES.index("runtime_error")
+    codes[passed] = PASSED_CODE
+    return codes
+
+
+class ResultColumns:
+    """单个模型评测结果的列式表示，只保留分析需要的字段"""
+
+    __slots__ = ('test_ids', 'passed', 'error_codes', 'models')
+
+    def __init__(self, test_ids: np.ndarray, passed: np.ndarray, error_codes: np.ndarray, models: List[str]):
+        self.test_ids = test_ids
+        self.passed = passed
+        self.error_codes = error_codes
+        self.models = models
+
+    def __len__(self) -> int:
+        return len(self.test_ids)
+
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[str, Dict]]) -> 'ResultColumns':
+        test_ids, passed, heads = [], [], []
+        models = set()
+        for test_id, record in items:
+            test_ids.append(int(test_id))
+            passed.append(bool(record.get('passed')))
+            heads.append(message_head(record.get('message')))
+            models.add(record.get('model'))
+
+        passed = np.array(passed, dtype=bool)
+        return cls(
+            np.array(test_ids, dtype=np.int64),
+            passed,
+            classify_vectorized(passed, heads),
+            sorted(model for model in models if model),
+        )
+
+    @classmethod
+    def concat(cls, first: 'ResultColumns', second: 'ResultColumns') -> 'ResultColumns':
+        return cls(
+            np.concatenate([first.test_ids, second.test_ids]),
+            np.concatenate([first.passed, second.passed]),
+            np.concatenate([first.error_codes, second.error_codes]),
+            sorted(set(first.models) | set(second.models)),
+        )
+
+    @classmethod
+    def from_checkpoint(cls, file_path: str) -> 'ResultColumns':
+        return cls.from_items(iter_checkpoint_items(file_path))
+
+    @classmethod
+    def from_file(cls, f: BinaryIO) -> 'ResultColumns':
+        return cls.from_items(iter_file_items(f))
+
+    @classmethod
+    def from_store(cls, store, model: str, stage: str) -> 'ResultColumns':
+        """从 SQLite 结果库中只查询需要的列"""
+        items = ((test_id, {'passed': passed, 'message': head, 'model': model})
+                 for test_id, passed, head in store.iter_result_heads(model, stage, MESSAGE_HEAD_CHARS))
+        return cls.from_items(items)
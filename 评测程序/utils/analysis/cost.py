@@ -0,0 +1,194 @@
+"""
+按批量推理结果中的 usage 字段统计实际 token 用量和费用，并与评测结果关联
+
+    python -m utils.analysis.cost --run DeepSeek-V3 stage5 ../Results_V3_1/results_v3_5.jsonl \\
+        ../checkpoint_V3/checkpoint_DeepSeek_V3.json
+    python -m utils.analysis.cost --db results.db --run DeepSeek-R1 default VolcEngine_batch_response_R1.jsonl
+"""
+import argparse
+import csv
+import json
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .columns import ResultColumns
+
+# 每百万 token 的价格（元）：(输入, 输出)，按模型名（小写）中的关键字匹配，可用 --price 覆盖
+PRICES = {
+    "deepseek-r1": (4.0, 16.0),
+    "deepseek-v3": (2.0, 8.0),
+}
+DEFAULT_PRICE = (4.0, 16.0)
+
+
+def match_price(model: str, prices: Dict[str, Tuple[float, float]]) -> Tuple[float, float]:
+    model = (model or "").lower()
+    for key, price in prices.items():
+        if key.lower() in model:
+            return price
+    return DEFAULT_PRICE
+
+
+def iter_usage(file_path: str) -> Iterator[Tuple[int, str, Dict]]:
+    """逐行读取批量推理结果中的 (test_id, 模型, usage)，跳过失败和没有 usage 的请求"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("error") is not None:
+                continue
+            body = record["response"]["body"]
+            usage = body.get("usage")
+            if usage:
+                yield int(record["custom_id"].split("-")[-1]), body.get("model", ""), usage
+
+
+class UsageColumns:
+    """单个批量推理结果文件的 token 用量，按 test_id 排序的列式表示"""
+
+    __slots__ = ('test_ids', 'prompt', 'completion', 'reasoning', 'models')
+
+    def __init__(self, test_ids: np.ndarray, prompt: np.ndarray, completion: np.ndarray,
+                 reasoning: np.ndarray, models: List[str]):
+        order = np.argsort(test_ids, kind="stable")
+        self.test_ids = test_ids[order]
+        self.prompt = prompt[order]
+        self.completion = completion[order]
+        self.reasoning = reasoning[order]
+        self.models = models
+
+    def __len__(self) -> int:
+        return len(self.test_ids)
+
+    @classmethod
+    def from_response_file(cls, file_path: str) -> 'UsageColumns':
+        test_ids, prompt, completion, reasoning = [], [], [], []
+        models = set()
+        for test_id, model, usage in iter_usage(file_path):
+            details = usage.get("completion_tokens_details") or {}
+            test_ids.append(test_id)
+            prompt.append(usage.get("prompt_tokens", 0))
+            completion.append(usage.get("completion_tokens", 0))
+            reasoning.append(details.get("reasoning_tokens", 0))
+            models.add(model)
+        return cls(
+            np.array(test_ids, dtype=np.int64),
+            np.array(prompt, dtype=np.int64),
+            np.array(completion, dtype=np.int64),
+            np.array(reasoning, dtype=np.int64),
+            sorted(model for model in models if model),
+        )
+
+
+def cost_summary(usage: UsageColumns, results: ResultColumns, price: Tuple[float, float]) -> Dict:
+    """
+    汇总 token 用量和费用，并按 test_id 与评测结果连接
+
+    费用按全部有 usage 的请求计算（没有评测结果的请求同样产生费用），
+    每个通过测试点的费用 = 总费用 / 通过数。
+    """
+    input_price, output_price = price
+    # completion_tokens 已包含 reasoning_tokens
+    costs = (usage.prompt * input_price + usage.completion * output_price) / 1e6
+
+    common, usage_idx, result_idx = np.intersect1d(usage.test_ids, results.test_ids, return_indices=True)
+    passed_mask = np.zeros(len(usage), dtype=bool)
+    passed_mask[usage_idx] = results.passed[result_idx]
+    judged_mask = np.zeros(len(usage), dtype=bool)
+    judged_mask[usage_idx] = True
+    failed_mask = judged_mask & ~passed_mask
+
+    passed = int(passed_mask.sum())
+    total_cost = float(costs.sum())
+    return {
+        "requests": len(usage),
+        "judged": len(common),
+        "passed": passed,
+        "pass_rate": passed / len(common) if len(common) else 0.0,
+        "prompt_tokens": int(usage.prompt.sum()),
+        "completion_tokens": int(usage.completion.sum()),
+        "reasoning_tokens": int(usage.reasoning.sum()),
+        "cost": total_cost,
+        "cost_per_request": total_cost / len(usage) if len(usage) else 0.0,
+        "cost_per_passed": total_cost / passed if passed else float("nan"),
+        "completion_passed_mean": float(usage.completion[passed_mask].mean()) if passed else 0.0,
+        "completion_failed_mean": float(usage.completion[failed_mask].mean()) if failed_mask.any() else 0.0,
+    }
+
+
+def load_results(checkpoint: Optional[str], store, model: str, stage: str) -> ResultColumns:
+    if checkpoint:
+        return ResultColumns.from_checkpoint(checkpoint)
+    return ResultColumns.from_store(store, model, stage)
+
+
+def parse_price(spec: str) -> Tuple[str, Tuple[float, float]]:
+    """模型关键字=输入价格,输出价格（元/百万 token）"""
+    key, _, values = spec.partition("=")
+    try:
+        input_price, output_price = (float(value) for value in values.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"价格格式应为 模型=输入,输出，例如 deepseek-v3=2,8: {spec}")
+    return key, (input_price, output_price)
+
+
+def print_report(rows: List[Dict]) -> None:
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(title="Token 用量与费用（元）")
+    for header in ("模型", "阶段", "请求数", "评测数", "通过数", "通过率", "输入 token", "输出 token",
+                   "推理 token", "总费用", "每请求", "每通过"):
+        table.add_column(header, justify="left" if header in ("模型", "阶段") else "right")
+    # 每个通过测试点的费用从低到高，没有通过的排在最后
+    for row in sorted(rows, key=lambda r: (r["passed"] == 0, r["passed"] and r["cost_per_passed"])):
+        table.add_row(
+            row["model"], row["stage"], str(row["requests"]), str(row["judged"]), str(row["passed"]),
+            f"{row['pass_rate']:.2%}", f"{row['prompt_tokens']:,}", f"{row['completion_tokens']:,}",
+            f"{row['reasoning_tokens']:,}", f"{row['cost']:.2f}", f"{row['cost_per_request']:.4f}",
+            f"{row['cost_per_passed']:.4f}",
+        )
+    Console().print(table)
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict]:
+    parser = argparse.ArgumentParser(description="按 usage 字段统计实际 token 用量和每个通过测试点的费用")
+    parser.add_argument("--run", nargs="+", action="append", required=True, metavar="ARG",
+                        help="模型 阶段 批量推理结果JSONL [checkpoint]；省略 checkpoint 时从 --db 读取该模型/阶段")
+    parser.add_argument("--db", default=None, help="SQLite 结果库")
+    parser.add_argument("--price", type=parse_price, action="append", default=[],
+                        help="模型关键字=输入价格,输出价格（元/百万 token），例如 deepseek-v3=2,8")
+    parser.add_argument("--csv", default=None, help="同时导出 CSV")
+    args = parser.parse_args(argv)
+
+    # --price 指定的关键字优先匹配
+    overrides = dict(args.price)
+    prices = {**overrides, **{key: value for key, value in PRICES.items() if key not in overrides}}
+    store = None
+    if args.db:
+        from ..checkpoint import SQLiteResultStore
+        store = SQLiteResultStore(args.db)
+
+    rows = []
+    for run in args.run:
+        if len(run) not in (3, 4) or (len(run) == 3 and store is None):
+            parser.error("--run 需要 模型 阶段 结果文件 checkpoint（使用 --db 时可省略 checkpoint）")
+        model, stage, response_file = run[:3]
+        usage = UsageColumns.from_response_file(response_file)
+        results = load_results(run[3] if len(run) == 4 else None, store, model, stage)
+        price = match_price(usage.models[0] if usage.models else model, prices)
+        rows.append({"model": model, "stage": stage, **cost_summary(usage, results, price)})
+
+    print_report(rows)
+    if args.csv:
+        with open(args.csv, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    return rows
+
+
+if __name__ == "__main__":
+    main()
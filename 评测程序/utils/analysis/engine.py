@@ -0,0 +1,62 @@
+from collections import Counter
+from typing import Dict, Optional
+
+import numpy as np
+
+from ..checkpoint.classify import ERROR_LABELS
+from .columns import ERROR_TYPES, ResultColumns
+from .problem_index import ProblemIndex
+
+
+def _failure_counts(error_codes: np.ndarray, passed: np.ndarray) -> Counter:
+    counts = np.bincount(error_codes[~passed].astype(np.int64), minlength=len(ERROR_TYPES))
+    return Counter({ERROR_LABELS[error_type]: int(count)
+                    for error_type, count in zip(ERROR_TYPES, counts) if count})
+
+
+def _basic_stats(passed: np.ndarray, error_codes: np.ndarray) -> Dict:
+    total = len(passed)
+    passed_count = int(passed.sum())
+    return {
+        'total': total,
+        'passed': passed_count,
+        'failed': total - passed_count,
+        'failure_counts': _failure_counts(error_codes, passed),
+    }
+
+
+def summarize(columns: ResultColumns, index: Optional[ProblemIndex] = None) -> Dict:
+    """
+    对单个模型的列式结果做汇总
+
+    返回的字典与 analyze.load_and_analyze_data 兼容；提供题目索引时额外包含
+    按数据集来源（by_source）、难度（by_difficulty）和按题目（by_problem）的切片。
+    """
+    stats = _basic_stats(columns.passed, columns.error_codes)
+    stats['models'] = columns.models
+    if index is None:
+        return stats
+
+    sources = index.source_codes(columns.test_ids)
+    stats['by_source'] = {
+        name: _basic_stats(columns.passed[sources == code], columns.error_codes[sources == code])
+        for code, name in enumerate(index.sources)
+        if np.any(sources == code)
+    }
+
+    difficulties = index.difficulty_codes(columns.test_ids)
+    if difficulties is not None:
+        stats['by_difficulty'] = {
+            name: _basic_stats(columns.passed[difficulties == code], columns.error_codes[difficulties == code])
+            for code, name in enumerate(index.difficulties)
+            if np.any(difficulties == code)
+        }
+
+    problems = index.problems(columns.test_ids)
+    known = problems >= 0
+    stats['by_problem'] = {
+        'total': np.bincount(problems[known], minlength=index.num_problems),
+        'passed': np.bincount(problems[known], weights=columns.passed[known],
+                              minlength=index.num_problems).astype(np.int64),
+    }
+    return stats
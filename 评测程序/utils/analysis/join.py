@@ -0,0 +1,94 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .columns import ResultColumns
+from .problem_index import ProblemIndex
+
+MISSING = -1
+
+
+class ResultMatrix:
+    """
+    多个模型按 test_id 对齐后的结果矩阵
+
+    outcomes[m, test_id] 取值 1（通过）/ 0（失败）/ -1（该模型没有这个测试点）。
+    以 test_id 直接作为列下标，相当于对所有 checkpoint 做一次按 test_id 的索引连接，
+    每个模型只需要提供列式结果，而不必同时把所有 checkpoint 完整读入内存。
+    """
+
+    def __init__(self, names: List[str], outcomes: np.ndarray):
+        self.names = names
+        self.outcomes = outcomes
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, ResultColumns]) -> 'ResultMatrix':
+        names = list(columns)
+        size = 1 + max((int(col.test_ids.max()) for col in columns.values() if len(col)), default=0)
+        outcomes = np.full((len(names), size), MISSING, dtype=np.int8)
+        for row, col in enumerate(columns.values()):
+            outcomes[row, col.test_ids] = col.passed
+        return cls(names, outcomes)
+
+    def agreement(self) -> np.ndarray:
+        """两两模型在共同测试点上结论（通过/失败）一致的比例"""
+        n = len(self.names)
+        present = self.outcomes != MISSING
+        matrix = np.full((n, n), np.nan)
+        for i in range(n):
+            for j in range(i, n):
+                both = present[i] & present[j]
+                if not both.any():
+                    continue
+                rate = float(np.mean(self.outcomes[i, both] == self.outcomes[j, both]))
+                matrix[i, j] = matrix[j, i] = rate
+        return matrix
+
+    def per_problem(self, index: ProblemIndex) -> Dict[str, np.ndarray]:
+        """
+        各模型按题目统计的测试数和通过数
+
+        Returns:
+            {'total': [模型数, 题目数], 'passed': [模型数, 题目数]}
+        """
+        size = min(self.outcomes.shape[1], len(index.problem_of))
+        problems = index.problem_of[:size]
+        known = problems >= 0
+        totals = np.zeros((len(self.names), index.num_problems), dtype=np.int64)
+        passed = np.zeros_like(totals)
+        for row in range(len(self.names)):
+            outcome = self.outcomes[row, :size]
+            mask = known & (outcome != MISSING)
+            totals[row] = np.bincount(problems[mask], minlength=index.num_problems)
+            passed[row] = np.bincount(problems[mask], weights=outcome[mask],
+                                      minlength=index.num_problems).astype(np.int64)
+        return {'total': totals, 'passed': passed}
+
+    def problem_spread(self, index: ProblemIndex, baseline: Optional[int] = None,
+                       top: int = 20) -> List[Dict]:
+        """
+        找出模型间通过率差异最大的题目
+
+        指定 baseline 时按“相对基线模型的最大退步”排序，否则按各模型通过率的极差排序；
+        只有一个模型时没有差异可比，按通过率从低到高排序。
+        """
+        counts = self.per_problem(index)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rates = counts['passed'] / counts['total']
+        covered = (counts['total'] > 0).all(axis=0)
+        if len(self.names) == 1:
+            score = 1 - rates[0]
+        elif baseline is None:
+            score = np.nanmax(rates, axis=0) - np.nanmin(rates, axis=0)
+        else:
+            score = rates[baseline] - np.nanmin(rates, axis=0)
+        score = np.where(covered, score, -np.inf)
+
+        order = np.argsort(-score, kind='stable')[:top]
+        return [{
+            'problem': index.problem_labels[p],
+            'source': index.sources[index.problem_sources[p]],
+            'total': counts['total'][:, p],
+            'rates': rates[:, p],
+            'score': float(score[p]),
+        } for p in order if np.isfinite(score[p]) and score[p] > 0]
@@ -0,0 +1,63 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .cache import AnalysisCache
+from .columns import ResultColumns
+from .engine import summarize
+from .problem_index import ProblemIndex
+
+# 子进程内共享的题目索引和缓存目录，由进程池 initializer 设置，避免每个任务重复传输
+_worker_index: Optional[ProblemIndex] = None
+_worker_cache_dir: Optional[str] = None
+
+
+def expand_paths(patterns: Iterable[str]) -> List[str]:
+    """展开文件列表中的通配符，保持顺序并去重；不匹配任何文件的普通路径原样保留"""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def _init_worker(problem_index: Optional[ProblemIndex], cache_dir: Optional[str]) -> None:
+    global _worker_index, _worker_cache_dir
+    _worker_index = problem_index
+    _worker_cache_dir = cache_dir
+
+
+def load_one(path: str, problem_index: Optional[ProblemIndex] = None,
+             cache_dir: Optional[str] = None) -> Tuple[ResultColumns, Dict]:
+    if cache_dir:
+        columns = AnalysisCache(cache_dir).load_columns(path)
+    else:
+        columns = ResultColumns.from_checkpoint(path)
+    return columns, summarize(columns, problem_index)
+
+
+def _load_worker(path: str) -> Tuple[ResultColumns, Dict]:
+    return load_one(path, _worker_index, _worker_cache_dir)
+
+
+def load_many(paths: List[str], problem_index: Optional[ProblemIndex] = None,
+              max_workers: Optional[int] = None,
+              cache_dir: Optional[str] = None) -> Dict[str, Tuple[ResultColumns, Dict]]:
+    """
+    并行加载多个结果文件
+
+    每个文件在独立的子进程中解析和汇总，只把列式结果和统计信息传回主进程，
+    因此总耗时取决于最大的文件，峰值内存也只与同时解析的文件数有关。
+    指定 cache_dir 时未变化的文件直接读取缓存，只追加了记录的文件增量解析。
+    """
+    workers = min(len(paths), max_workers or os.cpu_count() or 1)
+    if workers <= 1:
+        return {path: load_one(path, problem_index, cache_dir) for path in paths}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(problem_index, cache_dir)) as pool:
+        results = list(pool.map(_load_worker, paths))
+    return dict(zip(paths, results))
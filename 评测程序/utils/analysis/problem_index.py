@@ -0,0 +1,113 @@
+import hashlib
+import json
+from typing import Dict, List, Optional
+
+import numpy as np
+
+UNKNOWN_SOURCE = "未知"
+
+
+def _content_key(problem: Dict) -> str:
+    return hashlib.sha1((problem.get('content') or "").encode('utf-8')).hexdigest()
+
+
+class ProblemIndex:
+    """
+    test_id -> 题目 / 数据集来源 的索引
+
+    测试数据按 ALL_Problems 中题目和提交的顺序连续编号，因此重放生成顺序即可
+    得到每个 test_id 所属的题目；题目来源（ITSP / YBK）按题面内容在各子数据集中查找，
+    题目带有 difficulty 字段时同时记录难度。
+    """
+
+    def __init__(self, problem_of: np.ndarray, source_of: np.ndarray,
+                 problem_labels: List[str], problem_sources: np.ndarray, sources: List[str],
+                 problem_difficulties: Optional[np.ndarray] = None, difficulties: Optional[List[str]] = None):
+        self.problem_of = problem_of          # 下标为 test_id，值为题目序号，-1 表示未知
+        self.source_of = source_of            # 下标为 test_id，值为来源序号
+        self.problem_labels = problem_labels
+        self.problem_sources = problem_sources
+        self.sources = sources
+        self.problem_difficulties = problem_difficulties
+        self.difficulties = difficulties or []
+
+    @property
+    def num_problems(self) -> int:
+        return len(self.problem_labels)
+
+    def problems(self, test_ids: np.ndarray) -> np.ndarray:
+        return self._lookup(self.problem_of, test_ids, -1)
+
+    def source_codes(self, test_ids: np.ndarray) -> np.ndarray:
+        return self._lookup(self.source_of, test_ids, self.sources.index(UNKNOWN_SOURCE))
+
+    def difficulty_codes(self, test_ids: np.ndarray) -> Optional[np.ndarray]:
+        """每个测试点所属题目的难度编号，题目数据中没有难度信息时返回 None"""
+        if self.problem_difficulties is None:
+            return None
+        problems = self.problems(test_ids)
+        codes = np.full(len(problems), -1, dtype=np.int16)
+        known = problems >= 0
+        codes[known] = self.problem_difficulties[problems[known]]
+        return codes
+
+    @staticmethod
+    def _lookup(table: np.ndarray, test_ids: np.ndarray, default: int) -> np.ndarray:
+        result = np.full(len(test_ids), default, dtype=table.dtype)
+        in_range = (test_ids >= 0) & (test_ids < len(table))
+        result[in_range] = table[test_ids[in_range]]
+        return result
+
+    @classmethod
+    def from_problems(cls, problems_file: str, source_files: Optional[Dict[str, str]] = None,
+                      require_assistant: bool = False) -> 'ProblemIndex':
+        """
+        按 generate_data.process_dataset 的编号规则重放生成顺序
+
+        Args:
+            problems_file: 生成测试数据时使用的题目文件
+            source_files: 来源名称 -> 子数据集文件，例如 {"ITSP": ..., "YBK": ...}
+            require_assistant: 生成时是否跳过了没有 assistant 字段的提交（多轮阶段）
+        """
+        sources = list(source_files or {}) + [UNKNOWN_SOURCE]
+        source_by_content = {}
+        for code, path in enumerate((source_files or {}).values()):
+            with open(path, 'r', encoding='utf-8') as f:
+                for problem in json.load(f):
+                    source_by_content.setdefault(_content_key(problem), code)
+
+        with open(problems_file, 'r', encoding='utf-8') as f:
+            problems = json.load(f)
+
+        problem_of = [-1]  # test_id 从 1 开始
+        problem_labels = []
+        problem_sources = []
+        difficulty_labels = []
+        for problem in problems:
+            if not problem.get('test_case'):
+                continue
+            index = len(problem_labels)
+            problem_labels.append(str(problem.get('title') or f"#{index + 1}"))
+            problem_sources.append(source_by_content.get(_content_key(problem), len(sources) - 1))
+            difficulty = problem.get('difficulty')
+            difficulty_labels.append(None if difficulty is None else str(difficulty))
+            for submission in problem['submissions']:
+                if require_assistant and not submission.get('assistant'):
+                    continue
+                problem_of.append(index)
+
+        problem_of = np.array(problem_of, dtype=np.int32)
+        problem_sources = np.array(problem_sources, dtype=np.int8)
+        source_of = np.full(len(problem_of), len(sources) - 1, dtype=np.int8)
+        known = problem_of >= 0
+        source_of[known] = problem_sources[problem_of[known]]
+
+        difficulties = sorted({label for label in difficulty_labels if label is not None})
+        problem_difficulties = None
+        if difficulties:
+            problem_difficulties = np.array(
+                [-1 if label is None else difficulties.index(label) for label in difficulty_labels],
+                dtype=np.int16,
+            )
+        return cls(problem_of, source_of, problem_labels, problem_sources, sources,
+                   problem_difficulties, difficulties)
@@ -0,0 +1,5 @@
+from .error_logger import ErrorLogger, LoggedError
+from .log_queue import BatchedFileHandler, start_queue_logging
+from .writer import BackgroundWriter
+
+__all__ = ['ErrorLogger', 'LoggedError', 'BackgroundWriter', 'BatchedFileHandler', 'start_queue_logging']
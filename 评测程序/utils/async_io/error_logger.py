@@ -0,0 +1,80 @@
+import json
+import queue
+import threading
+import traceback
+import zlib
+from datetime import datetime
+from typing import Dict, Optional
+
+_STOP = object()
+
+
+class LoggedError(Exception):
+    """错误已经写入错误日志，外层只需计数，不再重复记录"""
+
+    def __init__(self, message: str, error_type: str = "UNEXPECTED_ERROR", retriable: bool = True):
+        super().__init__(message)
+        self.error_type = error_type
+        # 是否值得在下次运行时重试（网络/评测机故障可以，缺少响应或提取不到代码则不必）
+        self.retriable = retriable
+
+
+class ErrorLogger:
+    """
+    异步的结构化错误日志
+
+    每条错误写成一行紧凑的 JSONL，只引用 test_id / test_case_ref，不再内联测试用例、
+    提示词和模型响应；按 payload_sample_rate 抽样的测试点额外附带完整上下文。
+    序列化和写盘都在后台线程中完成，调用方只做一次入队。
+    """
+
+    def __init__(self, path: str, payload_sample_rate: float = 0.0, max_queue: int = 10000):
+        self.path = path
+        self.payload_sample_rate = payload_sample_rate
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, name="error-logger", daemon=True)
+        self._thread.start()
+
+    def _sampled(self, test_id) -> bool:
+        # 按 test_id 确定性抽样，同一个测试点在多次运行中的抽样结果一致
+        if self.payload_sample_rate <= 0:
+            return False
+        return zlib.crc32(str(test_id).encode()) % 10000 < self.payload_sample_rate * 10000
+
+    def log(self, test_id, error_type: str, error_msg: str,
+            context: Optional[Dict] = None, exception: Optional[BaseException] = None) -> None:
+        context = context or {}
+        record = {
+            "timestamp": datetime.now().isoformat(),
+            "test_id": test_id,
+            "error_type": error_type,
+            "error_message": error_msg,
+            "model": context.get("model"),
+            "test_case_ref": context.get("test_case_ref"),
+        }
+        if exception is not None:
+            record["exception_type"] = type(exception).__name__
+            record["exception_msg"] = str(exception)
+            record["traceback"] = "".join(
+                traceback.format_exception(type(exception), exception, exception.__traceback__))
+        if self._sampled(test_id):
+            record["payload"] = dict(context)
+        self._queue.put(record)
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            if record is _STOP:
+                break
+            self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            if self._queue.empty():
+                self._file.flush()
+        self._file.flush()
+
+    def close(self) -> None:
+        """写完队列中剩余的记录后关闭文件"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._file.close()
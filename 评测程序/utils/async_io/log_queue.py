@@ -0,0 +1,41 @@
+import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import List
+
+
+class BatchedFileHandler(logging.FileHandler):
+    """不逐条 flush 的文件日志，最多每 flush_interval 秒刷新一次缓冲区"""
+
+    def __init__(self, filename: str, flush_interval: float = 1.0, encoding: str = 'utf-8'):
+        super().__init__(filename, encoding=encoding)
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+
+    def flush(self) -> None:
+        now = time.monotonic()
+        if now - self._last_flush >= self.flush_interval:
+            super().flush()
+            self._last_flush = now
+
+    def close(self) -> None:
+        super().flush()
+        super().close()
+
+
+def start_queue_logging(handlers: List[logging.Handler], level: int = logging.INFO,
+                        fmt: str = "%(message)s") -> QueueListener:
+    """
+    把根日志改为只入队，由监听线程写入实际的 handler
+
+    调用方线程不再直接写文件；程序结束时需调用返回值的 stop() 写完剩余日志。
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    formatter = logging.Formatter(fmt)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    logging.basicConfig(level=level, format=fmt, handlers=[QueueHandler(log_queue)])
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
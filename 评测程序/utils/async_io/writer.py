@@ -0,0 +1,119 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, List, Optional
+
+_STOP = object()
+_FLUSH = object()
+
+
+class BackgroundWriter:
+    """
+    后台批量写线程
+
+    调用方只把记录放入队列，由后台线程攒批后调用 write_batch 落盘。
+    累计 max_batch 条或距批次第一条记录超过 flush_interval 秒时写一次，
+    flush() / close() 会立即写出所有未落盘的记录并等待完成。
+
+    写入失败的批次不会丢弃：记录留在待写列表中，按 retry_delay 起指数退避重试（新记录并入同一批）。
+    flush() / close() 时最多连续尝试 final_attempts 次，仍然失败才放弃，
+    并把这批记录交给 on_drop（例如把对应测试点退回待评测状态）。
+    """
+
+    def __init__(self, write_batch: Callable[[List], None], flush_interval: float = 2.0,
+                 max_batch: int = 100, max_queue: int = 10000, name: str = "background-writer",
+                 retry_delay: float = 0.5, max_retry_delay: float = 30.0, final_attempts: int = 5,
+                 on_drop: Optional[Callable[[List], None]] = None):
+        self.write_batch = write_batch
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.final_attempts = final_attempts
+        self.on_drop = on_drop
+        self._backoff = 0.0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item) -> None:
+        self._queue.put(item)
+
+    def flush(self) -> None:
+        """写出当前所有已提交的记录"""
+        if self._thread is not None:
+            self._queue.put(_FLUSH)
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _try_write(self, pending: List) -> bool:
+        try:
+            self.write_batch(list(pending))
+        except Exception as e:
+            self._backoff = min(self.max_retry_delay, max(self.retry_delay, self._backoff * 2))
+            logging.error(f"后台写入失败（{len(pending)} 条记录），{self._backoff:.1f} 秒后重试: {e}")
+            return False
+        self._backoff = 0.0
+        return True
+
+    def _done(self, pending: List) -> None:
+        for _ in pending:
+            self._queue.task_done()
+        pending.clear()
+
+    def _write(self, pending: List) -> bool:
+        """写出一批记录；失败时保留在 pending 中等待重试，返回是否写成功"""
+        if not self._try_write(pending):
+            return False
+        self._done(pending)
+        return True
+
+    def _write_final(self, pending: List) -> None:
+        """flush / close 时写出剩余记录，连续失败 final_attempts 次后放弃"""
+        for attempt in range(self.final_attempts):
+            if attempt:
+                time.sleep(self._backoff)
+            if self._try_write(pending):
+                self._done(pending)
+                return
+        logging.error(f"后台写入放弃（{len(pending)} 条记录）")
+        if self.on_drop is not None:
+            try:
+                self.on_drop(list(pending))
+            except Exception as e:
+                logging.error(f"处理未写入的记录失败: {e}")
+        self._done(pending)
+
+    def _run(self) -> None:
+        pending: List = []
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if pending else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                if not self._write(pending):
+                    deadline = time.monotonic() + self._backoff
+                continue
+
+            if item is _STOP or item is _FLUSH:
+                if pending:
+                    self._write_final(pending)
+                self._queue.task_done()
+                if item is _STOP:
+                    return
+                continue
+
+            if not pending:
+                deadline = time.monotonic() + self.flush_interval
+            pending.append(item)
+            # 退避期间只攒批，等 deadline 到了再重试
+            if len(pending) >= self.max_batch and not self._backoff:
+                if not self._write(pending):
+                    deadline = time.monotonic() + self._backoff
@@ -0,0 +1,11 @@
+from .classify import ERROR_LABELS, classify_failure
+from .sqlite_store import SQLiteResultStore, import_checkpoint
+from .case_table import TestCaseTable, compute_test_case_ref, side_table_path
+from .shard import (expand_shard_files, in_shard, merge_checkpoints, parse_shard, shard_checkpoint_path,
+                    split_checkpoint)
+from .work_state import WorkJournal, journal_path
+
+__all__ = ['ERROR_LABELS', 'classify_failure', 'SQLiteResultStore', 'import_checkpoint',
+           'TestCaseTable', 'compute_test_case_ref', 'side_table_path', 'WorkJournal', 'journal_path',
+           'expand_shard_files', 'in_shard', 'merge_checkpoints', 'parse_shard', 'shard_checkpoint_path',
+           'split_checkpoint']
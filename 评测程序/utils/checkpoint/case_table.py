@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+
+def compute_test_case_ref(test_cases: List[Dict]) -> str:
+    """根据测试用例内容计算稳定的引用ID（同一题目的所有提交共享同一个ID）"""
+    payload = json.dumps(test_cases, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def side_table_path(checkpoint_file: str) -> str:
+    """checkpoint 对应的测试用例共享表路径"""
+    root, _ = os.path.splitext(checkpoint_file)
+    return f"{root}.test_cases.json"
+
+
+class TestCaseTable:
+    """
+    题目级测试用例共享表
+
+    checkpoint 中的每条结果只保存 `test_case_ref`，真正的测试用例内容按引用ID
+    保存在一张共享表里，避免同一题目的测试输入在每个提交的结果中重复存储。
+    path 为 None 时只在内存中使用（例如结果写入 SQLite 库时），save() 不写文件。
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._lock = threading.Lock()
+        self._cases: Dict[str, List[Dict]] = self._load()
+        # id(list) -> (list, ref)，同一个列表对象只计算一次哈希
+        self._memo: Dict[int, tuple] = {}
+        self._dirty = False
+
+    def _load(self) -> Dict[str, List[Dict]]:
+        if self.path is not None and os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def __len__(self) -> int:
+        return len(self._cases)
+
+    def add(self, test_cases: List[Dict]) -> str:
+        """登记一组测试用例，返回其引用ID"""
+        memo = self._memo.get(id(test_cases))
+        if memo is not None and memo[0] is test_cases:
+            return memo[1]
+
+        ref = compute_test_case_ref(test_cases)
+        with self._lock:
+            self._memo[id(test_cases)] = (test_cases, ref)
+            if ref not in self._cases:
+                self._cases[ref] = test_cases
+                self._dirty = True
+        return ref
+
+    def get(self, ref: str) -> Optional[List[Dict]]:
+        return self._cases.get(ref)
+
+    def merge(self, other: 'TestCaseTable') -> None:
+        """合并另一张共享表（例如输入checkpoint自带的表）"""
+        with self._lock:
+            for ref, test_cases in other._cases.items():
+                if ref not in self._cases:
+                    self._cases[ref] = test_cases
+                    self._dirty = True
+
+    def compact(self, records: Dict[str, Dict]) -> int:
+        """
+        将旧格式记录中内联的 test_case / prompt 迁移为引用
+
+        Returns:
+            int: 被迁移的记录数
+        """
+        migrated = 0
+        for record in records.values():
+            if 'test_case' in record:
+                test_cases = record.pop('test_case')
+                if test_cases is not None:
+                    record['test_case_ref'] = self.add(test_cases)
+                migrated += 1
+            record.pop('prompt', None)
+        return migrated
+
+    def resolve(self, record: Dict) -> Dict:
+        """返回带有完整 test_case 的记录副本（兼容旧格式）"""
+        if 'test_case' in record:
+            return record
+        resolved = dict(record)
+        resolved['test_case'] = self.get(record.get('test_case_ref'))
+        return resolved
+
+    def save(self, force: bool = False) -> None:
+        """有新增内容时写回共享表"""
+        if self.path is None:
+            return
+        with self._lock:
+            if not (self._dirty or force):
+                return
+            snapshot = dict(self._cases)
+            self._dirty = False
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,20 @@
+from typing import Optional
+
+# 失败原因分类，键用于存储/查询，值用于报表展示
+ERROR_LABELS = {
+    "runtime_error": "运行时错误",
+    "wrong_answer": "答案错误",
+    "other": "其他错误",
+}
+
+
+def classify_failure(passed: bool, message: Optional[str]) -> Optional[str]:
+    """根据评测信息对失败原因分类，通过的用例返回 None"""
+    if passed:
+        return None
+    message = message or ""
+    if "Runtime Error" in message:
+        return "runtime_error"
+    if "Wrong Answer" in message:
+        return "wrong_answer"
+    return "other"
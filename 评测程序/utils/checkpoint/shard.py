@@ -0,0 +1,131 @@
+import argparse
+import glob
+import json
+import os
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from .case_table import TestCaseTable, side_table_path
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """解析 "i/N"（i 从 0 开始）"""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"分片格式应为 i/N，例如 0/4: {spec}")
+    if count <= 0 or not 0 <= index < count:
+        raise ValueError(f"分片编号超出范围: {spec}")
+    return index, count
+
+
+def shard_of(test_id, count: int) -> int:
+    """按 test_id 的稳定哈希分片，与进程、机器和测试数据的顺序无关"""
+    return zlib.crc32(str(test_id).encode("utf-8")) % count
+
+
+def in_shard(test_id, shard: Optional[Tuple[int, int]]) -> bool:
+    if shard is None:
+        return True
+    index, count = shard
+    return shard_of(test_id, count) == index
+
+
+def shard_checkpoint_path(checkpoint_file: str, shard: Tuple[int, int]) -> str:
+    """各分片独立的 checkpoint 路径，例如 checkpoint.shard-0-of-4.json"""
+    root, ext = os.path.splitext(checkpoint_file)
+    return f"{root}.shard-{shard[0]}-of-{shard[1]}{ext or '.json'}"
+
+
+def merge_checkpoints(shard_files: List[str], output_file: str) -> Dict[str, int]:
+    """
+    合并分片 checkpoint 及其测试用例共享表
+
+    同一个 test_id 出现在多个分片中时（例如改变分片数后重跑）保留时间戳较新的记录。
+    输出与单进程运行的 checkpoint 格式一致，可以直接交给 analyze.py。
+    """
+    merged: Dict[str, Dict] = {}
+    table = TestCaseTable(side_table_path(output_file))
+    duplicates = 0
+    for path in shard_files:
+        with open(path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        shard_table = TestCaseTable(side_table_path(path))
+        shard_table.compact(records)
+        table.merge(shard_table)
+        for test_id, record in records.items():
+            existing = merged.get(test_id)
+            if existing is not None:
+                duplicates += 1
+                if (existing.get("timestamp") or "") >= (record.get("timestamp") or ""):
+                    continue
+            merged[test_id] = record
+
+    ordered = dict(sorted(merged.items(), key=lambda item: int(item[0])))
+    table.save()
+    tmp_path = f"{output_file}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(ordered, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, output_file)
+    return {"shards": len(shard_files), "records": len(ordered), "duplicates": duplicates}
+
+
+def split_checkpoint(checkpoint_file: str, count: int) -> List[str]:
+    """
+    把已有的 checkpoint 按分片拆开，返回各分片 checkpoint 路径
+
+    已经存在的分片文件只补入其中缺少的记录（例如之后单进程运行新增的结果），已有记录保持不变，
+    这样在单进程和分片运行之间切换时已完成的测试点不会重评。
+    """
+    paths = [shard_checkpoint_path(checkpoint_file, (index, count)) for index in range(count)]
+    if not os.path.exists(checkpoint_file):
+        return paths
+
+    with open(checkpoint_file, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+    table = TestCaseTable(side_table_path(checkpoint_file))
+    table.compact(records)
+    for index, path in enumerate(paths):
+        shard_records = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                shard_records = json.load(f)
+        missing = {test_id: record for test_id, record in records.items()
+                   if shard_of(test_id, count) == index and test_id not in shard_records}
+        if not missing and os.path.exists(path):
+            continue
+        shard_table = TestCaseTable(side_table_path(path))
+        for record in missing.values():
+            test_cases = table.get(record.get("test_case_ref"))
+            if test_cases is not None:
+                shard_table.add(test_cases)
+        shard_table.save()
+        shard_records.update(missing)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(shard_records, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    return paths
+
+
+def expand_shard_files(patterns: List[str], output_file: str) -> List[str]:
+    """展开通配符，排除共享表、工作状态日志和输出文件本身"""
+    paths = sorted({path for pattern in patterns for path in (glob.glob(pattern) or [pattern])})
+    return [path for path in paths
+            if not path.endswith((".test_cases.json", ".journal.jsonl"))
+            and os.path.abspath(path) != os.path.abspath(output_file)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="合并分片 checkpoint")
+    parser.add_argument("shard_files", nargs="+", help="分片 checkpoint 文件，支持通配符")
+    parser.add_argument("-o", "--output", required=True, help="合并后的 checkpoint 路径")
+    args = parser.parse_args()
+
+    summary = merge_checkpoints(expand_shard_files(args.shard_files, args.output), args.output)
+    print(f"合并完成! {summary['shards']} 个分片, 共 {summary['records']} 条记录"
+          f"（重复 {summary['duplicates']} 条） -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import argparse
+import json
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .classify import classify_failure
+from .case_table import TestCaseTable, side_table_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    model TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    test_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    error_type TEXT,
+    passed INTEGER NOT NULL,
+    message TEXT,
+    code TEXT,
+    response TEXT,
+    test_case_ref TEXT,
+    timestamp TEXT,
+    PRIMARY KEY (model, stage, test_id)
+);
+CREATE INDEX IF NOT EXISTS idx_results_status ON results (model, stage, status);
+CREATE INDEX IF NOT EXISTS idx_results_error_type ON results (model, stage, error_type);
+CREATE TABLE IF NOT EXISTS test_cases (
+    ref TEXT PRIMARY KEY,
+    test_case TEXT NOT NULL
+);
+"""
+
+UPSERT_SQL = """
+INSERT INTO results (model, stage, test_id, status, error_type, passed,
+                     message, code, response, test_case_ref, timestamp)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (model, stage, test_id) DO UPDATE SET
+    status = excluded.status,
+    error_type = excluded.error_type,
+    passed = excluded.passed,
+    message = excluded.message,
+    code = excluded.code,
+    response = excluded.response,
+    test_case_ref = excluded.test_case_ref,
+    timestamp = excluded.timestamp
+"""
+
+RECORD_COLUMNS = ("timestamp", "passed", "message", "code", "response", "model", "test_case_ref")
+
+
+class SQLiteResultStore:
+    """
+    基于 SQLite 的评测结果存储
+
+    每个 (model, stage, test_id) 一行，WAL 模式下多个线程/进程可以同时写入，
+    断点续测和跨模型对比都可以直接用索引查询完成，而不必加载整个 checkpoint。
+    """
+
+    def __init__(self, db_path: str, timeout: float = 30.0):
+        self.db_path = db_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 连接不能跨线程共享，每个工作线程持有自己的连接
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row(model: str, stage: str, test_id, record: Dict) -> Tuple:
+        passed = bool(record.get("passed"))
+        return (
+            model,
+            stage,
+            int(test_id),
+            "passed" if passed else "failed",
+            classify_failure(passed, record.get("message")),
+            int(passed),
+            record.get("message"),
+            record.get("code"),
+            record.get("response"),
+            record.get("test_case_ref"),
+            record.get("timestamp"),
+        )
+
+    def upsert(self, model: str, stage: str, test_id, record: Dict,
+               test_cases: Optional[List[Dict]] = None) -> None:
+        """写入（或覆盖）单条结果"""
+        conn = self._connect()
+        with conn:
+            conn.execute(UPSERT_SQL, self._row(model, stage, test_id, record))
+            if test_cases is not None and record.get("test_case_ref"):
+                conn.execute(
+                    "INSERT OR IGNORE INTO test_cases (ref, test_case) VALUES (?, ?)",
+                    (record["test_case_ref"], json.dumps(test_cases, ensure_ascii=False)),
+                )
+
+    def upsert_many(self, model: str, stage: str, records: Dict[str, Dict]) -> None:
+        """批量写入 checkpoint 形式的结果（test_id -> record）"""
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                UPSERT_SQL,
+                (self._row(model, stage, test_id, record) for test_id, record in records.items()),
+            )
+
+    def save_test_cases(self, test_cases: Dict[str, List[Dict]]) -> None:
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO test_cases (ref, test_case) VALUES (?, ?)",
+                ((ref, json.dumps(cases, ensure_ascii=False)) for ref, cases in test_cases.items()),
+            )
+
+    def get_test_cases(self, ref: str) -> Optional[List[Dict]]:
+        row = self._connect().execute(
+            "SELECT test_case FROM test_cases WHERE ref = ?", (ref,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def completed_ids(self, model: str, stage: str) -> Set[str]:
+        """已完成的测试ID集合（与 checkpoint 的键格式一致）"""
+        rows = self._connect().execute(
+            "SELECT test_id FROM results WHERE model = ? AND stage = ?", (model, stage)
+        )
+        return {str(row[0]) for row in rows}
+
+    def iter_records(self, model: str, stage: str,
+                     status: Optional[str] = None) -> Iterable[Tuple[str, Dict]]:
+        sql = ("SELECT test_id, timestamp, passed, message, code, response, model, test_case_ref "
+               "FROM results WHERE model = ? AND stage = ?")
+        params: List = [model, stage]
+        if status is not None:
+            sql += " AND status = ?"
+            params.append(status)
+        for row in self._connect().execute(sql + " ORDER BY test_id", params):
+            record = dict(zip(RECORD_COLUMNS, row[1:]))
+            record["passed"] = bool(record["passed"])
+            yield str(row[0]), record
+
+    def iter_result_heads(self, model: str, stage: str,
+                          head_chars: int = 128) -> Iterable[Tuple[int, bool, str]]:
+        """只查询分析需要的列：(test_id, passed, 评测信息开头)"""
+        rows = self._connect().execute(
+            "SELECT test_id, passed, substr(message, 1, ?) FROM results "
+            "WHERE model = ? AND stage = ? ORDER BY test_id",
+            (head_chars, model, stage),
+        )
+        for test_id, passed, head in rows:
+            yield test_id, bool(passed), head
+
+    def load_records(self, model: str, stage: str) -> Dict[str, Dict]:
+        """以 checkpoint 的形式返回某个模型/阶段的全部结果"""
+        return dict(self.iter_records(model, stage))
+
+    def runs(self) -> List[Tuple[str, str]]:
+        """库中所有的 (model, stage) 组合"""
+        return self._connect().execute(
+            "SELECT DISTINCT model, stage FROM results ORDER BY model, stage"
+        ).fetchall()
+
+    def summary(self) -> Dict[Tuple[str, str], Dict]:
+        """按 (model, stage) 汇总通过数和各类错误数"""
+        stats: Dict[Tuple[str, str], Dict] = {}
+        rows = self._connect().execute(
+            "SELECT model, stage, COUNT(*), SUM(passed) FROM results GROUP BY model, stage"
+        )
+        for model, stage, total, passed in rows:
+            stats[(model, stage)] = {"total": total, "passed": passed or 0, "failure_counts": {}}
+        rows = self._connect().execute(
+            "SELECT model, stage, error_type, COUNT(*) FROM results "
+            "WHERE error_type IS NOT NULL GROUP BY model, stage, error_type"
+        )
+        for model, stage, error_type, count in rows:
+            stats[(model, stage)]["failure_counts"][error_type] = count
+        return stats
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def import_checkpoint(store: SQLiteResultStore, checkpoint_file: str, model: str, stage: str) -> int:
+    """将已有的 JSON checkpoint 导入数据库，返回导入条数"""
+    with open(checkpoint_file, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+    table = TestCaseTable(side_table_path(checkpoint_file))
+    table.compact(records)
+    store.upsert_many(model, stage, records)
+    refs = {record.get("test_case_ref") for record in records.values()}
+    store.save_test_cases({ref: table.get(ref) for ref in refs if table.get(ref) is not None})
+    return len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="将 JSON checkpoint 导入 SQLite 结果库")
+    parser.add_argument("checkpoint_file")
+    parser.add_argument("--db", required=True, help="SQLite 数据库路径")
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--stage", default="default")
+    args = parser.parse_args()
+
+    store = SQLiteResultStore(args.db)
+    count = import_checkpoint(store, args.checkpoint_file, args.model, args.stage)
+    print(f"导入完成! 共 {count} 条记录 -> {args.db} ({args.model}/{args.stage})")
+
+
+if __name__ == "__main__":
+    main()
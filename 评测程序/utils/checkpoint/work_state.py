@@ -0,0 +1,181 @@
+import json
+import os
+import socket
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows 下只做进程内加锁
+    fcntl = None
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED_RETRIABLE = "failed_retriable"
+FAILED_FINAL = "failed_final"
+
+
+def journal_path(base_file: str, model: Optional[str] = None, stage: Optional[str] = None) -> str:
+    """checkpoint（或结果库）对应的工作状态日志路径；库中有多个模型时按模型和阶段区分"""
+    root, _ = os.path.splitext(base_file)
+    parts = [root] + [part for part in (model, stage) if part]
+    return ".".join(parts) + ".journal.jsonl"
+
+
+class WorkJournal:
+    """
+    测试点的工作状态日志
+
+    每次状态变化追加一行 JSONL（test_id、状态、尝试次数、持有者、时间），
+    读取时以每个 test_id 的最后一行为准。状态有：
+    pending → in_flight → done / failed_retriable / failed_final。
+
+    多个进程共用同一个日志文件时，领取测试点前加文件锁并读入其他进程新追加的记录，
+    因此同一个测试点不会被并发评测；持有者进程退出（或租约过期）后，
+    遗留的 in_flight 测试点可以被重新领取，超过 max_attempts 次后记为 failed_final。
+    由输入决定的终止失败（响应缺失、代码提取失败等）记录输入的摘要 input_key，
+    领取时输入已经变化（例如换了响应文件）的测试点重新评测。
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3, lease_seconds: float = 1800.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        self._offset = 0
+        self._file = open(path, 'ab+')
+        with self._locked():
+            self._refresh()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def locked(self):
+        """持有日志的文件锁；共用日志的进程据此串行化对共享文件（JSON checkpoint）的读-合并-写"""
+        return self._locked()
+
+    def _refresh(self) -> None:
+        """读入上次读取之后（包括其他进程）追加的记录"""
+        self._file.seek(self._offset)
+        data = self._file.read()
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if line.strip():
+                entry = json.loads(line)
+                self._entries[entry["test_id"]] = entry
+        self._offset += end
+
+    def _append(self, test_id: str, state: str, attempts: int, error_type: Optional[str] = None,
+                input_key: Optional[str] = None) -> None:
+        entry = {"test_id": test_id, "state": state, "attempts": attempts,
+                 "owner": self.owner, "ts": time.time()}
+        if error_type:
+            entry["error_type"] = error_type
+        if input_key:
+            entry["input_key"] = input_key
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(line)
+        self._file.flush()
+        self._entries[test_id] = entry
+        self._offset = self._file.tell()
+
+    def _owner_gone(self, entry: Dict) -> bool:
+        host, _, pid = entry.get("owner", "").rpartition(":")
+        if entry.get("owner") == self.owner:
+            return True
+        if time.time() - entry.get("ts", 0) > self.lease_seconds:
+            return True
+        # 同一台机器上可以直接确认持有者进程是否还在（Windows 上 os.kill 会结束进程，只看租约）
+        if os.name == "posix" and host == socket.gethostname() and pid.isdigit():
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                return True
+            except PermissionError:
+                return False
+        return False
+
+    def state(self, test_id) -> str:
+        entry = self._entries.get(str(test_id))
+        return entry["state"] if entry else PENDING
+
+    def claim(self, test_id, input_key: Optional[str] = None) -> bool:
+        """
+        领取一个测试点，返回 False 表示它已完成、已终止或正由其他进程处理
+
+        input_key 与终止失败时记录的不同时，视为输入已变化，重新计数并领取。
+        """
+        key = str(test_id)
+        with self._locked():
+            self._refresh()
+            entry = self._entries.get(key)
+            attempts = entry["attempts"] if entry else 0
+            if entry is not None:
+                if (entry["state"] == FAILED_FINAL and entry.get("input_key")
+                        and input_key and entry["input_key"] != input_key):
+                    attempts = 0
+                elif entry["state"] in (DONE, FAILED_FINAL):
+                    return False
+                if entry["state"] == IN_FLIGHT and not self._owner_gone(entry):
+                    return False
+                if attempts >= self.max_attempts:
+                    # 反复中断在同一个测试点上（例如导致进程崩溃）时不再重试
+                    self._append(key, FAILED_FINAL, attempts, entry.get("error_type", "ABANDONED"))
+                    return False
+            self._append(key, IN_FLIGHT, attempts + 1)
+            return True
+
+    def mark_done(self, test_ids: Iterable) -> None:
+        """结果已经落盘的测试点"""
+        with self._locked():
+            self._refresh()
+            for test_id in test_ids:
+                key = str(test_id)
+                entry = self._entries.get(key)
+                self._append(key, DONE, entry["attempts"] if entry else 1)
+
+    def release(self, test_ids: Iterable, error_type: str) -> None:
+        """评测已完成但结果没能落盘的测试点：退回 pending，本次尝试不计入次数，下次运行重新评测"""
+        with self._locked():
+            self._refresh()
+            for test_id in test_ids:
+                key = str(test_id)
+                entry = self._entries.get(key)
+                self._append(key, PENDING, max(0, (entry["attempts"] if entry else 1) - 1), error_type)
+
+    def mark_failed(self, test_id, error_type: str, retriable: bool = True, input_key: Optional[str] = None) -> str:
+        """
+        记录一次失败，返回新的状态（可重试的失败达到 max_attempts 次后转为 failed_final）
+
+        input_key 为导致失败的输入的摘要，见 claim()
+        """
+        key = str(test_id)
+        with self._locked():
+            self._refresh()
+            entry = self._entries.get(key)
+            attempts = entry["attempts"] if entry else 1
+            state = FAILED_RETRIABLE if retriable and attempts < self.max_attempts else FAILED_FINAL
+            self._append(key, state, attempts, error_type, input_key)
+            return state
+
+    def counts(self) -> Counter:
+        with self._lock:
+            return Counter(entry["state"] for entry in self._entries.values())
+
+    def close(self) -> None:
+        self._file.close()
@@ -0,0 +1,8 @@
+from .convert import attach_assistants, convert_to_requests
+from .records import (TestCaseRecord, iter_test_data, load_problem_table, load_test_data, problem_table_path,
+                      write_test_data)
+from .tokens import MAX_PROMPT_TOKENS, count_tokens, has_tokenizer, prompt_tokens
+
+__all__ = ['attach_assistants', 'convert_to_requests', 'TestCaseRecord', 'iter_test_data', 'load_test_data',
+           'load_problem_table', 'problem_table_path', 'write_test_data',
+           'MAX_PROMPT_TOKENS', 'count_tokens', 'has_tokenizer', 'prompt_tokens']
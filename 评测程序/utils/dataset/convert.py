@@ -0,0 +1,65 @@
+import json
+from typing import Optional
+
+from .tokens import MAX_PROMPT_TOKENS, prompt_tokens
+
+
+def convert_to_requests(input_file: str, output_file: str, max_prompt_tokens: Optional[int] = MAX_PROMPT_TOKENS,
+                        max_tokens: int = 8192) -> int:
+    """把测试数据转换为批量推理请求（JSONL，每行一个请求），返回请求数"""
+    with open(input_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    count = 0
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for item in data:
+            if max_prompt_tokens and prompt_tokens(item) > max_prompt_tokens:
+                print(f"测试用例 {item['test_id']} 的长度超过了{max_prompt_tokens} token，已被忽略！")
+                continue
+            request = {
+                "custom_id": f"test-{item['test_id']}",
+                "body": {
+                    "messages": [
+                        {
+                            "role": "user",
+                            "content": item['test_prompt']
+                        }
+                    ],
+                    "max_tokens": max_tokens,
+                    "top_p": 1
+                }
+            }
+            f.write(json.dumps(request, ensure_ascii=False) + '\n')
+            count += 1
+
+    print(f"转换完成！输出文件：{output_file}")
+    return count
+
+
+def attach_assistants(results_path: str, problems_path: str, output_path: str) -> int:
+    """
+    把批量推理结果按顺序写回题目文件，每个提交增加 assistant 字段
+
+    结果文件的行序与 generate_data 生成的 test_id 顺序一致，因此按顺序逐个对应。
+    """
+    with open(results_path, "r", encoding="utf-8") as f:
+        results = [json.loads(line) for line in f]
+
+    with open(problems_path, "r", encoding="utf-8") as f:
+        all_problems = json.load(f)
+
+    attached = 0
+    remaining = iter(results)
+    for problem in all_problems:
+        for submission in problem.get("submissions", []):
+            result = next(remaining, None)
+            if result is None:
+                break
+            submission["assistant"] = result["response"]["body"]["choices"][0]["message"]["content"]
+            attached += 1
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(all_problems, f, ensure_ascii=False, indent=2)
+
+    print(f"转换完成，文件已保存为 {output_path}")
+    return attached
@@ -0,0 +1,122 @@
+import json
+import os
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import ijson
+except ImportError:  # 未安装 ijson 时退化为整体 json.load
+    ijson = None
+
+from ..checkpoint.case_table import compute_test_case_ref
+
+PROMPT_COMPRESS_LEVEL = 6
+
+
+def problem_table_path(test_data_file: str) -> str:
+    """测试数据对应的题目表路径"""
+    root, _ = os.path.splitext(test_data_file)
+    return f"{root}.problems.json"
+
+
+def load_problem_table(test_data_file: str) -> Dict[str, Dict]:
+    """
+    题目表：problem_id -> {'content': 题面, 'test_case': 测试用例[, 'spj_code': 特判程序源码]}；
+    旧格式测试数据没有题目表
+    """
+    path = problem_table_path(test_data_file)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_test_data(output_file: str, records: List[Dict], problems: Dict[str, Dict]) -> None:
+    """写出测试数据和题目表，每条记录只保存 problem_id，测试用例和题面只在题目表中保存一份"""
+    with open(problem_table_path(output_file), 'w', encoding='utf-8') as f:
+        json.dump(problems, f, ensure_ascii=False, indent=2)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+
+
+def iter_test_data(file_path: str) -> Iterator[Dict]:
+    """逐条读取测试数据，安装了 ijson 时流式解析"""
+    with open(file_path, 'rb') as f:
+        if ijson is not None:
+            yield from ijson.items(f, 'item', use_float=True)
+        else:
+            yield from json.load(f)
+
+
+class TestCaseRecord:
+    """
+    测试数据中的一条记录（一个错误提交）
+
+    同一题目的所有提交共享同一个 test_case 列表对象（来自题目表或按内容去重）；
+    提示词以 zlib 压缩后的字节保存，访问 test_prompt 时才解压。支持 record['test_id'] / record.get(...) 形式的访问，
+    与原先的字典记录兼容。多解题目的 spj_code 为特判程序源码（同题目共享同一个字符串），其余为 None。
+    """
+
+    __slots__ = ('test_id', 'problem_id', 'test_case', 'test_case_ref', 'prompt_tokens', 'prompt_tokens_estimated',
+                 'spj_code', '_prompt')
+
+    def __init__(self, test_id: int, test_case: List[Dict], test_case_ref: str, test_prompt: str,
+                 prompt_tokens: Optional[int] = None, problem_id: Optional[str] = None,
+                 spj_code: Optional[str] = None, prompt_tokens_estimated: bool = False):
+        self.test_id = test_id
+        self.problem_id = problem_id
+        self.test_case = test_case
+        self.test_case_ref = test_case_ref
+        self.prompt_tokens = prompt_tokens
+        self.prompt_tokens_estimated = prompt_tokens_estimated
+        self.spj_code = spj_code
+        self._prompt = zlib.compress(test_prompt.encode('utf-8'), PROMPT_COMPRESS_LEVEL)
+
+    @property
+    def test_prompt(self) -> str:
+        return zlib.decompress(self._prompt).decode('utf-8')
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value) -> None:
+        setattr(self, key, value)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+
+def load_test_data(file_path: str) -> List[TestCaseRecord]:
+    """
+    读取测试数据并解析测试用例
+
+    记录带 problem_id 时从题目表取测试用例（每道题只计算一次引用ID）；
+    旧格式的记录内联了 test_case，按内容去重后只保留一份。
+    """
+    problems = load_problem_table(file_path)
+    by_problem: Dict[str, Tuple[List[Dict], str, Optional[str]]] = {}
+    interned: Dict[str, List[Dict]] = {}
+    records = []
+    for item in iter_test_data(file_path):
+        problem_id = item.get('problem_id')
+        if 'test_case' in item:
+            ref = compute_test_case_ref(item['test_case'])
+            test_case = interned.setdefault(ref, item['test_case'])
+            spj_code = item.get('spj_code')
+        else:
+            problem_id = str(problem_id)
+            if problem_id not in by_problem:
+                if problem_id not in problems:
+                    raise KeyError(f"题目表 {problem_table_path(file_path)} 中没有题目 {problem_id}"
+                                   f"（测试点 {item['test_id']}）")
+                cases = problems[problem_id]['test_case']
+                ref = compute_test_case_ref(cases)
+                by_problem[problem_id] = (interned.setdefault(ref, cases), ref, problems[problem_id].get('spj_code'))
+            test_case, ref, spj_code = by_problem[problem_id]
+        records.append(TestCaseRecord(item['test_id'], test_case, ref, item['test_prompt'],
+                                      item.get('prompt_tokens'), problem_id, spj_code,
+                                      bool(item.get('prompt_tokens_estimated'))))
+    return records
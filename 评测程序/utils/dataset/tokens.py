@@ -0,0 +1,48 @@
+import logging
+import math
+from functools import lru_cache
+from typing import Dict
+
+# 与 token_calculate.py 的估算口径一致
+TOKENIZER_MODEL = "gpt-3.5-turbo-0613"
+# 超过该 token 数的提示词在各阶段都被跳过
+MAX_PROMPT_TOKENS = 4096
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str = TOKENIZER_MODEL):
+    """按模型缓存 tiktoken 编码器；未安装 tiktoken 时返回 None"""
+    try:
+        import tiktoken
+    except ImportError:
+        logging.warning("未安装 tiktoken，按 UTF-8 字节数估算 token 数")
+        return None
+    return tiktoken.encoding_for_model(model)
+
+
+def has_tokenizer(model: str = TOKENIZER_MODEL) -> bool:
+    """是否能精确分词（已安装 tiktoken）；否则 count_tokens 返回的是估算值"""
+    return get_encoding(model) is not None
+
+
+def count_tokens(text: str, model: str = TOKENIZER_MODEL) -> int:
+    encoding = get_encoding(model)
+    if encoding is None:
+        # 中文约 3 字节/token，代码和英文约 3~4 字节/token，按 3 字节估算偏保守
+        return math.ceil(len(text.encode("utf-8")) / 3)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def prompt_tokens(test_case: Dict) -> int:
+    """
+    测试数据中提示词的 token 数
+
+    generate_data 生成时已写入 prompt_tokens 字段，后续阶段直接读取；
+    旧的测试数据没有该字段时才现算一次并写回该条记录。生成时未安装 tiktoken 的记录
+    带有 prompt_tokens_estimated 标记，当前环境能精确分词时重新计算并覆盖估算值。
+    """
+    tokens = test_case.get("prompt_tokens")
+    if tokens is None or (test_case.get("prompt_tokens_estimated") and has_tokenizer()):
+        tokens = test_case["prompt_tokens"] = count_tokens(test_case["test_prompt"])
+        test_case["prompt_tokens_estimated"] = not has_tokenizer()
+    return tokens
@@ -1,14 +1,20 @@
-from volcenginesdkarkruntime import Ark
+from functools import lru_cache
 
-client = Ark(
-    # 您的方舟API Key
-    api_key="", 
-    # 深度推理模型耗费时间会较长，请您设置较大的超时时间，避免超时，推荐30分钟以上
-    timeout=1800,
-    )
+
+@lru_cache(maxsize=None)
+def get_client():
+    """首次调用时才导入 SDK 并创建客户端，离线评测等不调用大模型的流程不承担这部分开销"""
+    from volcenginesdkarkruntime import Ark
+
+    return Ark(
+        # 您的方舟API Key
+        api_key="", 
+        # 深度推理模型耗费时间会较长，请您设置较大的超时时间，避免超时，推荐30分钟以上
+        timeout=1800,
+        )
 
 def get_ark_response(prompt: str) -> str:
-    completion = client.chat.completions.create(
+    completion = get_client().chat.completions.create(
         model="",
         messages=[
             {"role": "user", "content": prompt},
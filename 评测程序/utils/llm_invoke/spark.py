@@ -5,7 +5,6 @@ import time
 import random  
 from enum import Enum  
 from typing import Optional, Dict  
-import requests  
 
 class ModelType(Enum):  
     SPARK4 = "SPARK-4"  
@@ -131,7 +130,9 @@ def get_ebyte_response(
         "Accept" : "text/event-stream"
     })  
 
-    # 发送请求  
+    # 发送请求（requests 在首次调用时才导入）
+    import requests
+
     response = requests.post(  
         config["eb_api_url"] + model_config["endpoint"],  
         headers=headers,  
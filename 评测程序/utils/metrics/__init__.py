@@ -0,0 +1,5 @@
+from .exporter import MetricsFileWriter, MetricsServer
+from .registry import Histogram, RunMetrics
+from .timing import PhaseTimer
+
+__all__ = ['Histogram', 'RunMetrics', 'MetricsServer', 'MetricsFileWriter', 'PhaseTimer']
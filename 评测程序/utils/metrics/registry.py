@@ -0,0 +1,111 @@
+import bisect
+import threading
+import time
+from typing import Dict, List, Optional
+
+# 延迟类直方图的默认分桶（秒）
+DEFAULT_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 120, 300]
+
+
+class Histogram:
+    def __init__(self, buckets: Optional[List[float]] = None):
+        self.buckets = sorted(buckets or DEFAULT_BUCKETS)
+        self.counts = [0] * (len(self.buckets) + 1)  # 最后一个桶为 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        result, running = [], 0
+        for count in self.counts:
+            running += count
+            result.append(running)
+        return result
+
+
+class RunMetrics:
+    """
+    评测过程中的实时指标
+
+    计数器（通过/失败/错误等）、直方图（评测机延迟、LLM延迟）和仪表（队列深度），
+    可渲染为 Prometheus 文本格式，供本地 HTTP 端点或定期刷新的指标文件使用。
+    """
+
+    COUNTERS = {
+        'tests_total': "已处理的测试用例数",
+        'tests_passed': "通过的测试用例数",
+        'tests_failed': "未通过的测试用例数",
+        'tests_error': "处理过程中出错的测试用例数",
+        'tests_skipped': "被跳过的测试用例数",
+        'tests_prechecked': "本地预检查判为编译错误、未提交评测机的测试用例数",
+        'tests_deduplicated': "复用同题目归一化相同代码的评测结论、未提交评测机的测试用例数",
+    }
+    HISTOGRAMS = {
+        'judge_latency_seconds': "评测机请求耗时",
+        'llm_latency_seconds': "获取模型响应耗时",
+    }
+    GAUGES = {
+        'queue_depth': "等待处理的测试用例数",
+    }
+
+    def __init__(self, prefix: str = "ezcoding", labels: Optional[Dict[str, str]] = None):
+        self.prefix = prefix
+        self.labels = labels or {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.counters = {name: 0 for name in self.COUNTERS}
+        self.histograms = {name: Histogram() for name in self.HISTOGRAMS}
+        self.gauges = {name: 0.0 for name in self.GAUGES}
+
+    def inc(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            self.histograms[name].observe(value)
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self.gauges[name] = value
+
+    def throughput(self) -> float:
+        """每秒处理的测试用例数"""
+        elapsed = time.time() - self.started
+        return self.counters['tests_total'] / elapsed if elapsed > 0 else 0.0
+
+    def _label_str(self, extra: Optional[Dict[str, str]] = None) -> str:
+        labels = {**self.labels, **(extra or {})}
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+    def render(self) -> str:
+        """渲染为 Prometheus 文本格式"""
+        lines = []
+        with self._lock:
+            for name, help_text in self.COUNTERS.items():
+                metric = f"{self.prefix}_{name}"
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter",
+                          f"{metric}{self._label_str()} {self.counters[name]}"]
+            for name, help_text in self.GAUGES.items():
+                metric = f"{self.prefix}_{name}"
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge",
+                          f"{metric}{self._label_str()} {self.gauges[name]}"]
+            metric = f"{self.prefix}_throughput_per_second"
+            lines += [f"# HELP {metric} 平均吞吐量", f"# TYPE {metric} gauge",
+                      f"{metric}{self._label_str()} {self.throughput():.4f}"]
+            for name, help_text in self.HISTOGRAMS.items():
+                metric = f"{self.prefix}_{name}"
+                histogram = self.histograms[name]
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+                bounds = [str(bound) for bound in histogram.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, histogram.cumulative()):
+                    lines.append(f"{metric}_bucket{self._label_str({'le': bound})} {count}")
+                lines.append(f"{metric}_sum{self._label_str()} {histogram.sum:.6f}")
+                lines.append(f"{metric}_count{self._label_str()} {histogram.count}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,58 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+class PhaseTimer:
+    """
+    按阶段记录耗时
+
+    每次计时是一条轻量事件 (phase, seconds, test_id)，在内存中按阶段汇总；
+    指定 events_file 时事件同时以 JSONL 形式追加写入，便于事后分析单个测试点。
+    """
+
+    def __init__(self, events_file: Optional[str] = None):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = {}
+        self._events = open(events_file, 'a', encoding='utf-8') if events_file else None
+
+    @contextmanager
+    def span(self, phase: str, test_id: Optional[int] = None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start, test_id)
+
+    def record(self, phase: str, seconds: float, test_id: Optional[int] = None) -> None:
+        with self._lock:
+            self._samples.setdefault(phase, []).append(seconds)
+            if self._events is not None:
+                self._events.write(json.dumps({"phase": phase, "seconds": round(seconds, 6),
+                                               "test_id": test_id}) + "\n")
+
+    def summary(self) -> List[Dict]:
+        """各阶段的次数、总耗时、平均值、P50/P95 和最大值，按总耗时降序"""
+        rows = []
+        with self._lock:
+            for phase, samples in self._samples.items():
+                ordered = sorted(samples)
+                total = sum(ordered)
+                rows.append({
+                    "phase": phase,
+                    "count": len(ordered),
+                    "total": total,
+                    "mean": total / len(ordered),
+                    "p50": ordered[len(ordered) // 2],
+                    "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                    "max": ordered[-1],
+                })
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._events is not None:
+                self._events.close()
+                self._events = None
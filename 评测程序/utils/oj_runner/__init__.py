@@ -1,4 +1,12 @@
 from .client import run_c_code_in_oj  
 from .client import JudgeServerClient  
+from .client import is_verdict
+from .case_pack import CasePack, PackedCases, build_case_pack, case_pack_path, write_case_pack
+from .compare import MODES as COMPARE_MODES, Mismatch, OutputComparator, make_comparator
+from .local import run_c_code_locally
+from .precheck import Prechecker
+from .spj import SPJ, SPJCache, SPJCompileError, spj_cache_path, spj_version
 
-__all__ = ['run_c_code_in_oj', 'JudgeServerClient']
\ No newline at end of file
+__all__ = ['run_c_code_in_oj', 'JudgeServerClient', 'is_verdict', 'CasePack', 'PackedCases', 'build_case_pack', 'case_pack_path',
+           'write_case_pack', 'COMPARE_MODES', 'Mismatch', 'OutputComparator', 'make_comparator',
+           'run_c_code_locally', 'Prechecker', 'SPJ', 'SPJCache', 'SPJCompileError', 'spj_cache_path', 'spj_version']
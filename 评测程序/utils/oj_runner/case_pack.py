@@ -0,0 +1,141 @@
+"""
+测试用例二进制包：按 test_case_ref 分组保存原始输入/输出字节，评测时以内存映射方式读取
+
+    python -m utils.oj_runner.case_pack ../testdata_V3/test_data.json
+
+文件结构：
+    头部    MAGIC(8) | 索引偏移(u64) | 索引长度(u64)
+    数据区  每组依次为 该组测试用例 JSON 编码后的片段、各测试点的 input 字节、output 字节
+    索引    JSON：{test_case_ref: {"json": [偏移, 长度], "cases": [[入偏移, 入长度, 出偏移, 出长度], ...]}}
+
+本地评测直接把 input 的内存视图喂给程序的标准输入；评测机请求把 JSON 片段原样拼进请求体，
+不必每次请求都重新序列化多 MB 的输入。
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MAGIC = b"EZCPACK1"
+HEADER = struct.Struct("<8sQQ")
+
+
+def case_pack_path(test_data_file: str) -> str:
+    """测试数据对应的测试用例包路径"""
+    root, _ = os.path.splitext(test_data_file)
+    return f"{root}.cases.pack"
+
+
+def write_case_pack(path: str, groups: Iterable[Tuple[str, List[Dict]]]) -> int:
+    """写出测试用例包（先写临时文件再替换），返回分组数"""
+    index: Dict[str, Dict] = {}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, 0, 0))
+
+        def put(data: bytes) -> List[int]:
+            offset = f.tell()
+            f.write(data)
+            return [offset, len(data)]
+
+        for ref, test_cases in groups:
+            if ref in index:
+                continue
+            entry = {"json": put(json.dumps(test_cases).encode('utf-8')), "cases": []}
+            for case in test_cases:
+                entry["cases"].append(put(case.get('input', '').encode('utf-8'))
+                                      + put(case.get('output', '').encode('utf-8')))
+            index[ref] = entry
+
+        index_offset, index_length = put(json.dumps(index, separators=(',', ':')).encode('utf-8'))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, index_offset, index_length))
+    os.replace(tmp_path, path)
+    return len(index)
+
+
+class PackedCases:
+    """测试用例包中的一组测试用例，取出的都是内存映射上的视图，不复制数据"""
+
+    __slots__ = ('ref', '_view', '_entry')
+
+    def __init__(self, ref: str, view: memoryview, entry: Dict):
+        self.ref = ref
+        self._view = view
+        self._entry = entry
+
+    def __len__(self) -> int:
+        return len(self._entry["cases"])
+
+    def input(self, index: int) -> memoryview:
+        offset, length = self._entry["cases"][index][:2]
+        return self._view[offset:offset + length]
+
+    def output(self, index: int) -> memoryview:
+        offset, length = self._entry["cases"][index][2:]
+        return self._view[offset:offset + length]
+
+    def json_fragment(self) -> memoryview:
+        """整组测试用例的 JSON 编码，与 json.dumps(test_cases) 相同"""
+        offset, length = self._entry["json"]
+        return self._view[offset:offset + length]
+
+
+class CasePack:
+    """只读打开测试用例包"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        magic, index_offset, index_length = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"不是测试用例包: {path}")
+        self._index = json.loads(bytes(self._view[index_offset:index_offset + index_length]))
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, ref: str) -> bool:
+        return ref in self._index
+
+    def group(self, ref: str) -> Optional[PackedCases]:
+        entry = self._index.get(ref)
+        return PackedCases(ref, self._view, entry) if entry is not None else None
+
+    def close(self) -> None:
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # 仍有 PackedCases 视图在使用，映射随最后一个视图释放
+            pass
+        self._file.close()
+
+
+def build_case_pack(test_data_file: str, output: Optional[str] = None) -> int:
+    """由测试数据（含题目表）生成测试用例包"""
+    from ..dataset.records import load_test_data
+
+    records = load_test_data(test_data_file)
+    return write_case_pack(output or case_pack_path(test_data_file),
+                           ((record.test_case_ref, record.test_case) for record in records))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="由测试数据生成测试用例二进制包")
+    parser.add_argument("test_data_file")
+    parser.add_argument("-o", "--output", default=None, help="默认与测试数据同目录的 .cases.pack")
+    args = parser.parse_args()
+
+    output = args.output or case_pack_path(args.test_data_file)
+    groups = build_case_pack(args.test_data_file, output)
+    print(f"已写入 {groups} 组测试用例 -> {output}")
+
+
+if __name__ == "__main__":
+    main()
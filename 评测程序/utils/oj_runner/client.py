@@ -1,7 +1,6 @@
 import hashlib
 import json
-
-import requests
+import time
 
 from .languages import c_lang_config, cpp_lang_config, java_lang_config, c_lang_spj_config, c_lang_spj_compile, py2_lang_config, py3_lang_config, go_lang_config, php_lang_config, js_lang_config
 from .config import JUDGE_SERVER_TOKEN, JUDGE_SERVER_URL
@@ -10,16 +9,53 @@ class JudgeServerClientError(Exception):
     pass
 
 
+class StreamingBody:
+    """
+    由若干 bytes / memoryview 片段组成的请求体
+
+    requests 按 len() 设置 Content-Length，再按块调用 read() 发送，
+    片段（例如测试用例包中的内存映射视图）不会被拼接成一个完整的 bytes。
+    """
+
+    def __init__(self, parts):
+        self._parts = [memoryview(part).cast("B") for part in parts]
+        self._length = sum(part.nbytes for part in self._parts)
+        self._index = 0
+        self._offset = 0
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self._length
+        chunks = []
+        while size > 0 and self._index < len(self._parts):
+            part = self._parts[self._index]
+            chunk = part[self._offset:self._offset + size]
+            chunks.append(bytes(chunk))
+            size -= len(chunk)
+            self._offset += len(chunk)
+            if self._offset >= part.nbytes:
+                self._index += 1
+                self._offset = 0
+        return b"".join(chunks)
+
+
 class JudgeServerClient(object):
     def __init__(self, token, server_base_url):
         self.token = hashlib.sha256(token.encode("utf-8")).hexdigest()
         self.server_base_url = server_base_url.rstrip("/")
 
-    def _request(self, url, data=None):
+    def _request(self, url, data=None, body=None):
         kwargs = {"headers": {"X-Judge-Server-Token": self.token,
                               "Content-Type": "application/json"}}
-        if data:
+        if body is not None:
+            kwargs["data"] = body
+        elif data:
             kwargs["data"] = json.dumps(data)
+        # requests 导入较慢，首次发请求时才导入
+        import requests
         try:
             return requests.post(url, **kwargs).json()
         except Exception as e:
@@ -29,8 +65,12 @@ class JudgeServerClient(object):
         return self._request(self.server_base_url + "/ping")
 
     def judge(self, src, language_config, max_cpu_time, max_memory, test_case_id=None, test_case=None, spj_version=None, spj_config=None,
-              spj_compile_config=None, spj_src=None, output=False):
-        if not (test_case or test_case_id) or (test_case and test_case_id):
+              spj_compile_config=None, spj_src=None, output=False, test_case_json=None):
+        """test_case_json 为已编码好的测试用例 JSON 片段（见 case_pack），原样拼入请求体"""
+        if test_case_json is not None:
+            if test_case or test_case_id:
+                raise ValueError("invalid parameter")
+        elif not (test_case or test_case_id) or (test_case and test_case_id):
             raise ValueError("invalid parameter")
 
         data = {"language_config": language_config,
@@ -44,23 +84,57 @@ class JudgeServerClient(object):
                 "spj_compile_config": spj_compile_config,
                 "spj_src": spj_src,
                 "output": output}
+        if test_case_json is not None:
+            del data["test_case"]
+            head = json.dumps(data)[:-1] + ', "test_case": '
+            body = StreamingBody([head.encode("utf-8"), test_case_json, b"}"])
+            return self._request(self.server_base_url + "/judge", body=body)
         return self._request(self.server_base_url + "/judge", data=data)
 
     def compile_spj(self, src, spj_version, spj_compile_config):
         data = {"src": src, "spj_version": spj_version,
                 "spj_compile_config": spj_compile_config}
         return self._request(self.server_base_url + "/compile_spj", data=data)
-def run_c_code_in_oj(code, test_cases):  
+
+
+# 评测结论（通过 / 测试点失败 / 编译错误）的消息前缀；其他消息（连接失败、评测机出错、返回格式异常等）
+# 是评测过程本身的错误，与提交的代码无关
+VERDICT_PREFIXES = ("All test cases passed", "Test case ", "Compilation Error")
+
+
+def is_verdict(message) -> bool:
+    """run_c_code_in_oj / run_c_code_locally 返回的消息是否为评测结论"""
+    return (message or "").startswith(VERDICT_PREFIXES)
+
+
+def format_case_failure(index, error_type, output, expected, detail=None):
+    """单个测试点失败时的评测信息（评测机和本地评测使用同一格式）；detail 为第一处不一致的位置说明"""
+    if detail:
+        error_type = f"{error_type}  \n{detail}"
+    return f"""Test case {index} failed: {error_type}  
+Your output: {output}  
+Expected output: {expected}"""
+
+
+def run_c_code_in_oj(code, test_cases, timings=None, packed=None, spj=None):  
     """  
     运行C代码并进行在线评测  
     
     Args:  
         code (str): C语言代码，换行使用\n  
         test_cases (list): 测试用例列表，每个测试用例是包含input和output的字典  
+        timings (dict, optional): 传入时填充耗时（秒）：ping、judge_request（含网络的评测请求）、
+            judge_server（评测机报告的各测试点运行时间之和，编译错误等没有运行结果时不填）
+        packed (PackedCases, optional): 测试用例包中的同一组测试用例，请求体直接使用其中编码好的 JSON
+        spj (SPJ, optional): 已提前编译的特判程序（见 spj.SPJCache），输出交给特判程序判定
         
     Returns:  
         tuple: (是否通过, 错误信息)  
     """  
+    import requests
+
+    if timings is None:
+        timings = {}
     # 服务器配置  
     token = JUDGE_SERVER_TOKEN
     server_base_url = JUDGE_SERVER_URL
@@ -71,7 +145,9 @@ def run_c_code_in_oj(code, test_cases):
         
         # 检查服务器连接  
         try:  
+            ping_start = time.perf_counter()
             ping_result = client.ping()  
+            timings["ping"] = time.perf_counter() - ping_start
             if ping_result is None:  
                 return False, f"Unable to connect to judge server at {server_base_url}"  
         except JudgeServerClientError:  
@@ -81,14 +157,21 @@ def run_c_code_in_oj(code, test_cases):
             
         # 提交代码进行评测  
         try:  
+            judge_start = time.perf_counter()
             result = client.judge(  
                 src=code,  
                 language_config=c_lang_config,  
                 max_cpu_time=1000,  
                 max_memory=1024 * 1024 * 128,  
-                test_case=test_cases,  
+                test_case=None if packed is not None else test_cases,  
+                test_case_json=packed.json_fragment() if packed is not None else None,  
+                spj_version=spj.version if spj is not None else None,
+                spj_config=c_lang_spj_config if spj is not None else None,
+                spj_compile_config=c_lang_spj_compile if spj is not None else None,
+                spj_src=spj.src if spj is not None else None,
                 output=True  
             )  
+            timings["judge_request"] = time.perf_counter() - judge_start
         except JudgeServerClientError as e:  
             return False, f"Judge server error while submitting code: {str(e)}"  
         
@@ -107,6 +190,8 @@ def run_c_code_in_oj(code, test_cases):
         # 确保data字段存在且为列表  
         if not result.get("data") or not isinstance(result["data"], list):  
             return False, "Invalid judge result format"  
+
+        timings["judge_server"] = sum(case_result.get("real_time") or 0 for case_result in result["data"]) / 1000
             
         # 检查每个测试点  
         for i, case_result in enumerate(result["data"], 1):  
@@ -114,9 +199,7 @@ def run_c_code_in_oj(code, test_cases):
                 error_type = "Wrong Answer" if case_result["result"] == -1 else "Runtime Error"  
                 output = case_result.get('output', 'No output available')  
                 expected = test_cases[i-1].get('output', 'No expected output available')  
-                return False, f"""Test case {i} failed: {error_type}  
-Your output: {output}  
-Expected output: {expected}"""  
+                return False, format_case_failure(i, error_type, output, expected)  
         
         return True, "All test cases passed!"  
         
@@ -0,0 +1,219 @@
+"""
+本地评测的输出比较
+
+程序输出按块送入比较器，边读边比，发现第一处不一致就停止（本地评测随即结束该进程），
+不需要把整个输出读入内存；不一致时报告其在实际输出中的字节偏移和行号，以及两边该处的片段。
+
+比较模式：
+    exact       逐字节相同
+    rstrip      去掉末尾空白后逐字节相同（与评测机的比较规则一致，默认）
+    whitespace  按空白分隔的记号逐个相同（忽略空白的种类和数量）
+    float       同 whitespace，两边都是数值的记号允许 float_tolerance 的绝对/相对误差
+"""
+import math
+import re
+from typing import NamedTuple, Optional
+
+MODES = ("exact", "rstrip", "whitespace", "float")
+DEFAULT_MODE = "rstrip"
+FLOAT_TOLERANCE = 1e-6
+# 报告中两边各截取的字节数；运行错误时附带的实际输出开头长度
+EXCERPT_BYTES = 32
+HEAD_BYTES = 128
+TOKEN_RE = re.compile(rb"\S+")
+WHITESPACE = b" \t\n\r\x0b\x0c"
+
+
+class Mismatch(NamedTuple):
+    offset: int       # 不一致处在实际输出中的字节偏移
+    line: int         # 不一致处在实际输出中的行号（从 1 开始）
+    actual: bytes     # 实际输出从该处开始的片段，空表示输出已结束
+    expected: bytes   # 期望输出对应位置开始的片段，空表示期望输出已结束
+
+    def describe(self) -> str:
+        return f"First mismatch at byte {self.offset} (line {self.line})"
+
+
+def _first_difference(a, b) -> int:
+    """两段字节第一个不同的位置（一段是另一段的前缀时为较短者的长度），先按二分比较整段"""
+    lo, hi = 0, min(len(a), len(b))
+    while hi - lo > 64:
+        mid = (lo + hi) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid
+    for i in range(lo, hi):
+        if a[i] != b[i]:
+            return i
+    return hi
+
+
+class OutputComparator:
+    """比较器基类：feed() 逐块送入实际输出，finish() 在输出结束时调用，返回是否一致"""
+
+    def __init__(self, expected):
+        self.expected = memoryview(expected).cast("B")
+        self.mismatch: Optional[Mismatch] = None
+        self.head = b""
+        self._consumed = 0
+        self._lines = 1
+
+    def feed(self, chunk: bytes) -> bool:
+        if self.mismatch is None and chunk:
+            if len(self.head) < HEAD_BYTES:
+                self.head += chunk[:HEAD_BYTES - len(self.head)]
+            self._feed(chunk)
+            self._consumed += len(chunk)
+            self._lines += chunk.count(b"\n")
+        return self.mismatch is None
+
+    def finish(self) -> bool:
+        if self.mismatch is None:
+            self._finish()
+        return self.mismatch is None
+
+    def _fail_in_chunk(self, chunk: bytes, index: int, expected_offset: int) -> None:
+        self.mismatch = Mismatch(
+            self._consumed + index,
+            self._lines + chunk.count(b"\n", 0, index),
+            bytes(chunk[index:index + EXCERPT_BYTES]),
+            bytes(self.expected[expected_offset:expected_offset + EXCERPT_BYTES]),
+        )
+
+    def _fail_at_end(self, expected_offset: int) -> None:
+        self.mismatch = Mismatch(self._consumed, self._lines, b"",
+                                 bytes(self.expected[expected_offset:expected_offset + EXCERPT_BYTES]))
+
+    def _feed(self, chunk: bytes) -> None:
+        raise NotImplementedError
+
+    def _finish(self) -> None:
+        raise NotImplementedError
+
+
+class ExactComparator(OutputComparator):
+
+    def _feed(self, chunk: bytes) -> None:
+        expected = self.expected[self._consumed:self._consumed + len(chunk)]
+        if expected != chunk:
+            index = _first_difference(chunk, expected)
+            self._fail_in_chunk(chunk, index, self._consumed + index)
+
+    def _finish(self) -> None:
+        if self._consumed < len(self.expected):
+            self._fail_at_end(self._consumed)
+
+
+class RstripComparator(OutputComparator):
+
+    def __init__(self, expected):
+        super().__init__(expected)
+        core = len(self.expected)
+        while core and self.expected[core - 1] in WHITESPACE:
+            core -= 1
+        self._core = core
+
+    def _feed(self, chunk: bytes) -> None:
+        start = self._consumed
+        within = max(0, min(len(chunk), self._core - start))
+        if within:
+            expected = self.expected[start:start + within]
+            if expected != chunk[:within]:
+                index = _first_difference(chunk[:within], expected)
+                self._fail_in_chunk(chunk, index, start + index)
+                return
+        rest = chunk[within:]
+        if rest.strip(WHITESPACE):
+            # 期望输出的有效内容已经结束，实际输出后面还有非空白字符
+            index = within + len(rest) - len(rest.lstrip(WHITESPACE))
+            self._fail_in_chunk(chunk, index, self._core)
+
+    def _finish(self) -> None:
+        if self._consumed < self._core:
+            self._fail_at_end(self._consumed)
+
+
+class TokenComparator(OutputComparator):
+    """
+    按空白分隔的记号比较；跨块的记号暂存到下一块
+
+    实际输出与期望输出逐字节相同的前缀直接按块比较，不切分记号；
+    第一次出现字节差异时才从该处所在记号的开头起逐个比较记号。
+    """
+
+    def __init__(self, expected, float_tolerance: Optional[float] = None):
+        super().__init__(expected)
+        self.float_tolerance = float_tolerance
+        self._expected_tokens = None
+        self._carry = b""
+
+    def _same(self, actual: bytes, expected: bytes) -> bool:
+        if actual == expected:
+            return True
+        if self.float_tolerance is None:
+            return False
+        try:
+            a, b = float(actual), float(expected)
+        except ValueError:
+            return False
+        return math.isclose(a, b, rel_tol=self.float_tolerance, abs_tol=self.float_tolerance)
+
+    def _desync(self, position: int) -> None:
+        """[0, position) 与期望输出逐字节相同；从 position 所在记号的开头起改为按记号比较"""
+        start = position
+        while start > 0 and self.expected[start - 1] not in WHITESPACE:
+            start -= 1
+        self._expected_tokens = TOKEN_RE.finditer(self.expected, start)
+        # 已读入但属于该记号的部分（不含换行）作为待比较的开头
+        self._carry = bytes(self.expected[start:self._consumed]) if start < self._consumed else b""
+
+    def _compare_tokens(self, data: bytes, final: bool) -> None:
+        """比较 data 中的完整记号；data 以 _carry 开头，其在实际输出中的起点为 base"""
+        base = self._consumed - len(self._carry)
+        self._carry = b""
+        for match in TOKEN_RE.finditer(data):
+            if not final and match.end() == len(data):
+                self._carry = match.group()
+                return
+            expected = next(self._expected_tokens, None)
+            if expected is None or not self._same(match.group(), expected.group()):
+                start = match.start()
+                self.mismatch = Mismatch(
+                    base + start,
+                    self._lines + data.count(b"\n", 0, start),
+                    data[start:start + EXCERPT_BYTES],
+                    bytes(self.expected[expected.start():expected.start() + EXCERPT_BYTES])
+                    if expected is not None else b"",
+                )
+                return
+
+    def _feed(self, chunk: bytes) -> None:
+        if self._expected_tokens is None:
+            expected = self.expected[self._consumed:self._consumed + len(chunk)]
+            if expected == chunk:
+                return
+            self._desync(self._consumed)
+        self._compare_tokens(self._carry + bytes(chunk), final=False)
+
+    def _finish(self) -> None:
+        if self._expected_tokens is None:
+            self._desync(self._consumed)
+        self._compare_tokens(self._carry, final=True)
+        if self.mismatch is None:
+            expected = next(self._expected_tokens, None)
+            if expected is not None:
+                self._fail_at_end(expected.start())
+
+
+def make_comparator(expected, mode: str = DEFAULT_MODE,
+                    float_tolerance: float = FLOAT_TOLERANCE) -> OutputComparator:
+    if mode == "exact":
+        return ExactComparator(expected)
+    if mode == "rstrip":
+        return RstripComparator(expected)
+    if mode == "whitespace":
+        return TokenComparator(expected)
+    if mode == "float":
+        return TokenComparator(expected, float_tolerance)
+    raise ValueError(f"未知的比较模式: {mode}，可选 {MODES}")
@@ -0,0 +1,206 @@
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from .client import format_case_failure
+from .compare import DEFAULT_MODE, FLOAT_TOLERANCE, HEAD_BYTES, OutputComparator, make_comparator
+from .languages import c_lang_config
+
+# 与评测机 c_lang_config 的编译命令一致
+COMPILE_FLAGS = ["-DONLINE_JUDGE", "-O2", "-w", "-fmax-errors=3", "-std=c99"]
+READ_CHUNK = 64 * 1024
+# 特判程序的退出码：0 答案正确，1 答案错误，其他为特判程序自身出错
+SPJ_AC = 0
+SPJ_WA = 1
+
+
+def _limited_command(exe_path: str, max_cpu_time: int, max_memory: int) -> List[str]:
+    """
+    带 CPU 时间和地址空间限制的运行命令（仅 POSIX）
+
+    由 sh 的 ulimit 设置限制后再 exec 被测程序，而不是用 preexec_fn：
+    评测在多个线程中并发进行，fork 后在子进程里执行 Python 代码可能死锁。
+    """
+    if sys.platform == "win32":
+        return [exe_path]
+    cpu_seconds = max(1, -(-max_cpu_time // 1000))
+    return ["/bin/sh", "-c", f'ulimit -t {cpu_seconds} && ulimit -v {max_memory // 1024} && exec "$0"', exe_path]
+
+
+def _write_stdin(stream, data) -> None:
+    try:
+        stream.write(data)
+    except (BrokenPipeError, OSError):
+        # 程序没有读完输入就退出或被结束
+        pass
+    finally:
+        try:
+            stream.close()
+        except OSError:
+            pass
+
+
+def _run_case(command: List[str], stdin, comparator: OutputComparator, time_limit: float,
+              cwd: str) -> Optional[str]:
+    """
+    运行一个测试点，输出边读边交给比较器；返回错误类型，通过时返回 None
+
+    发现不一致后立即结束进程，不再读取剩余输出。
+    """
+    proc = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, cwd=cwd)
+    timed_out = threading.Event()
+
+    def kill_on_timeout():
+        timed_out.set()
+        proc.kill()
+
+    writer = threading.Thread(target=_write_stdin, args=(proc.stdin, stdin), daemon=True)
+    timer = threading.Timer(time_limit, kill_on_timeout)
+    writer.start()
+    timer.start()
+    try:
+        while True:
+            chunk = proc.stdout.read1(READ_CHUNK)
+            if not chunk:
+                break
+            if not comparator.feed(chunk):
+                proc.kill()
+                break
+        proc.wait()
+    finally:
+        timer.cancel()
+        proc.stdout.close()
+        writer.join()
+
+    if comparator.mismatch is not None:
+        return "Wrong Answer"
+    if timed_out.is_set() or proc.returncode != 0:
+        return "Runtime Error"
+    return None if comparator.finish() else "Wrong Answer"
+
+
+def _run_case_with_spj(command: List[str], stdin, spj_exe: str, time_limit: float,
+                       cwd: str) -> Tuple[Optional[str], bytes]:
+    """
+    运行一个测试点，输出写入文件后交给特判程序判定；返回 (错误类型, 实际输出开头)，通过时错误类型为 None
+
+    特判程序以 `spj 输入文件 输出文件` 调用（见 c_lang_spj_config），
+    退出码 SPJ_AC / SPJ_WA 之外的情况与评测机一样按运行错误处理。
+    """
+    in_path = os.path.join(cwd, "case.in")
+    out_path = os.path.join(cwd, "case.out")
+    with open(in_path, 'wb') as f:
+        f.write(stdin)
+    try:
+        with open(in_path, 'rb') as fin, open(out_path, 'wb') as fout:
+            proc = subprocess.run(command, stdin=fin, stdout=fout, stderr=subprocess.DEVNULL,
+                                  cwd=cwd, timeout=time_limit)
+        if proc.returncode != 0:
+            error_type = "Runtime Error"
+        else:
+            spj_proc = subprocess.run([spj_exe, in_path, out_path], stdout=subprocess.DEVNULL,
+                                      stderr=subprocess.DEVNULL, cwd=cwd, timeout=time_limit)
+            if spj_proc.returncode == SPJ_AC:
+                error_type = None
+            elif spj_proc.returncode == SPJ_WA:
+                error_type = "Wrong Answer"
+            else:
+                logging.warning(f"特判程序 {spj_exe} 异常退出: {spj_proc.returncode}")
+                error_type = "Runtime Error"
+    except subprocess.TimeoutExpired:
+        error_type = "Runtime Error"
+    with open(out_path, 'rb') as f:
+        head = f.read(HEAD_BYTES)
+    return error_type, head
+
+
+def run_c_code_locally(code, test_cases, timings=None, packed=None, gcc="gcc",
+                       max_cpu_time=1000, max_memory=1024 * 1024 * 128,
+                       compare=DEFAULT_MODE, float_tolerance=FLOAT_TOLERANCE, spj=None):
+    """
+    用本机 gcc 编译并逐个测试点运行，结果格式与 run_c_code_in_oj 相同
+
+    没有沙箱（只有 CPU 时间和内存的 rlimit），只应在隔离的评测环境中使用。
+    输出按 compare 指定的模式边读边比较（默认 rstrip，与评测机的比较规则一致），
+    答案错误时报告第一处不一致的位置和两边的片段，而不是完整输出；
+    超时、超内存和非零退出都记为 Runtime Error，与评测机结果的映射一致。
+
+    Args:
+        timings (dict, optional): 同 run_c_code_in_oj（没有 ping），另外填充 judge_compile（本机 gcc 编译时间）
+        packed (PackedCases, optional): 测试用例包中的同一组测试用例，
+            标准输入直接取自内存映射，不再从 test_cases 编码
+        compare (str): 比较模式，见 utils.oj_runner.compare.MODES
+        spj (SPJ, optional): 已编译到本地的特判程序（见 spj.SPJCache），指定时不再按 compare 比较
+    """
+    if timings is None:
+        timings = {}
+    gcc_path = shutil.which(gcc)
+    if gcc_path is None:
+        return False, f"Judge Error: {gcc} not found"
+
+    compile_config = c_lang_config["compile"]
+    judge_start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="judge-") as work_dir:
+        src_path = os.path.join(work_dir, compile_config["src_name"])
+        exe_path = os.path.join(work_dir, compile_config["exe_name"])
+        with open(src_path, 'w', encoding='utf-8') as f:
+            f.write(code)
+        compile_start = time.perf_counter()
+        try:
+            proc = subprocess.run([gcc_path, *COMPILE_FLAGS, src_path, "-lm", "-o", exe_path],
+                                  capture_output=True, timeout=compile_config["max_real_time"] / 1000)
+        except subprocess.TimeoutExpired:
+            return False, "Compilation Error:\nCompilation timed out"
+        finally:
+            timings["judge_compile"] = time.perf_counter() - compile_start
+        if proc.returncode != 0:
+            stderr = proc.stderr.decode("utf-8", errors="replace").replace(work_dir + os.sep, "")
+            return False, f"Compilation Error:\n{stderr}"
+
+        run_time = 0.0
+        command = _limited_command(exe_path, max_cpu_time, max_memory)
+        count = len(packed) if packed is not None else len(test_cases)
+        try:
+            for i in range(count):
+                stdin = packed.input(i) if packed is not None else test_cases[i].get('input', '').encode('utf-8')
+                expected = (packed.output(i) if packed is not None
+                            else test_cases[i].get('output', '').encode('utf-8'))
+                case_start = time.perf_counter()
+                if spj is not None:
+                    error_type, head = _run_case_with_spj(command, stdin, spj.exe_path, max_cpu_time * 3 / 1000,
+                                                          work_dir)
+                    run_time += time.perf_counter() - case_start
+                    if error_type is None:
+                        continue
+                    return False, format_case_failure(i + 1, error_type, head.decode("utf-8", errors="replace"),
+                                                      bytes(expected[:HEAD_BYTES]).decode("utf-8", errors="replace"))
+                comparator = make_comparator(expected, compare, float_tolerance)
+                error_type = _run_case(command, stdin, comparator, max_cpu_time * 3 / 1000, work_dir)
+                run_time += time.perf_counter() - case_start
+                if error_type is None:
+                    continue
+                mismatch = comparator.mismatch
+                if mismatch is not None:
+                    return False, format_case_failure(i + 1, error_type,
+                                                      mismatch.actual.decode("utf-8", errors="replace"),
+                                                      mismatch.expected.decode("utf-8", errors="replace"),
+                                                      detail=mismatch.describe())
+                # 运行错误只附带两边的开头
+                return False, format_case_failure(i + 1, error_type,
+                                                  comparator.head.decode("utf-8", errors="replace"),
+                                                  bytes(expected[:HEAD_BYTES]).decode("utf-8", errors="replace"))
+        except OSError as e:
+            logging.error(f"本地评测运行失败: {e}")
+            return False, f"Judge Error: {e}"
+        finally:
+            timings["judge_request"] = time.perf_counter() - judge_start
+            timings["judge_server"] = run_time
+
+    return True, "All test cases passed!"
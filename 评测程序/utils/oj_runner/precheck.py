@@ -0,0 +1,93 @@
+import hashlib
+import logging
+import re
+import shutil
+import subprocess
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+# 与评测机 c_lang_config 的编译选项保持一致，只做语法和语义检查，不生成目标文件
+SYNTAX_FLAGS = ["-DONLINE_JUDGE", "-w", "-fmax-errors=3", "-std=c99", "-fsyntax-only", "-x", "c", "-"]
+MAIN_RE = re.compile(r"\bmain\s*\(")
+INCLUDE_RE = re.compile(r"^[ \t]*#[ \t]*include[ \t]*[<\"]([^>\"\n]+)[>\"]", re.M)
+# 评测机（Linux gcc）上没有的 Windows/DOS 头文件；本机（例如 MinGW）可能有，不能只依赖本机 gcc 判断
+FORBIDDEN_HEADERS = frozenset({
+    "conio.h", "windows.h", "dos.h", "graphics.h", "bios.h", "process.h", "direct.h", "io.h", "alloc.h",
+})
+# 预检查自己给出的（而不是 gcc 报告的）编译错误带这个标记，分析时可以与评测机的编译错误区分
+PRECHECK_TAG = "[precheck]"
+
+
+class Prechecker:
+    """
+    评测前的本地静态检查
+
+    用本机 gcc -fsyntax-only 检查提取出的代码，编译不通过、缺少 main 或包含禁用头文件的提交直接判为编译错误，
+    消息格式与 run_c_code_in_oj 的 "Compilation Error:\\n..." 一致，不再占用评测机；
+    缺少 main 和禁用头文件不是 gcc 的输出，消息中带 PRECHECK_TAG 标记。
+    检查在线程池中并发执行（每次检查是一个独立的 gcc 进程），相同代码只检查一次。
+    本机没有 gcc 或检查本身出错时一律放行，交给评测机判定。
+    """
+
+    def __init__(self, gcc: str = "gcc", max_workers: int = 4, timeout: float = 10.0,
+                 forbidden_headers: Iterable[str] = FORBIDDEN_HEADERS):
+        self.gcc = shutil.which(gcc)
+        self.forbidden_headers = frozenset(forbidden_headers)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="precheck") if self.gcc else None
+        if self.gcc is None:
+            logging.warning(f"未找到 {gcc}，跳过本地预检查")
+
+    @property
+    def available(self) -> bool:
+        return self._pool is not None
+
+    def _check(self, code: str) -> Tuple[bool, str]:
+        if not MAIN_RE.search(code):
+            return False, f"Compilation Error:\n{PRECHECK_TAG} no main function"
+        forbidden = sorted({header.strip().lower() for header in INCLUDE_RE.findall(code)} & self.forbidden_headers)
+        if forbidden:
+            return False, f"Compilation Error:\n{PRECHECK_TAG} forbidden header: {', '.join(forbidden)}"
+        try:
+            proc = subprocess.run([self.gcc, *SYNTAX_FLAGS], input=code.encode("utf-8"),
+                                  capture_output=True, timeout=self.timeout)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logging.warning(f"本地预检查失败，交给评测机: {e}")
+            return True, ""
+        if proc.returncode == 0:
+            return True, ""
+        stderr = proc.stderr.decode("utf-8", errors="replace").replace("<stdin>", "main.c")
+        return False, f"Compilation Error:\n{stderr}"
+
+    def submit(self, code: str) -> Optional[Future]:
+        """提交检查（已提交过的相同代码直接返回原来的 Future）"""
+        if not self.available:
+            return None
+        key = hashlib.sha1(code.encode("utf-8")).hexdigest()
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = self._pool.submit(self._check, code)
+                self._futures[key] = future
+        return future
+
+    def check(self, code: str) -> Tuple[bool, str]:
+        """返回 (是否可以提交评测机, 编译错误信息)"""
+        if not self.available:
+            return True, ""
+        ok, message = self.submit(code).result()
+        with self._lock:
+            self.stats["checked"] += 1
+            if not ok:
+                self.stats["rejected"] += 1
+        return ok, message
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
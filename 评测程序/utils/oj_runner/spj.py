@@ -0,0 +1,141 @@
+"""
+特判程序（SPJ）：多解题目的输出由题目自带的特判程序判定，而不是与期望输出逐字比较
+
+特判程序按源码哈希得到 spj_version，每个版本只编译一次：
+    oj     提前调用评测机 /compile_spj，评测请求带上 spj_version（评测机按版本缓存可执行文件，
+           只有找不到时才用请求中附带的源码重新编译）
+    local  用本机 gcc 编译到缓存目录下的 spj-{spj_version}，跨运行复用
+编译在线程池中提前进行（prepare），评测时 get() 只等待对应版本的编译结果。
+"""
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from .client import JudgeServerClient
+from .config import JUDGE_SERVER_TOKEN, JUDGE_SERVER_URL
+from .languages import c_lang_spj_compile
+from .local import COMPILE_FLAGS
+
+
+class SPJ(NamedTuple):
+    version: str
+    src: str
+    exe_path: Optional[str] = None  # 本地编译的可执行文件，评测机模式下为 None
+
+
+class SPJCompileError(Exception):
+    pass
+
+
+def spj_version(src: str) -> str:
+    """特判程序源码的版本号（源码的 SHA-256 前 16 位），同一源码在评测机和本地缓存中共用"""
+    return hashlib.sha256(src.encode("utf-8")).hexdigest()[:16]
+
+
+def spj_cache_path(test_data_file: str) -> str:
+    """测试数据对应的本地特判程序缓存目录"""
+    root, _ = os.path.splitext(test_data_file)
+    return f"{root}.spj"
+
+
+class SPJCache:
+    """
+    按 spj_version 缓存特判程序的编译结果
+
+    编译失败的结果同样缓存（同一源码不再重复编译），网络等其他错误不缓存，下次 get() 时重试。
+    """
+
+    def __init__(self, judge: str = "oj", cache_dir: Optional[str] = None, max_workers: int = 4,
+                 gcc: str = "gcc"):
+        self.judge = judge
+        # 本地评测时被测程序在临时目录中运行，特判程序路径必须是绝对路径
+        self.cache_dir = os.path.abspath(cache_dir) if cache_dir else cache_dir
+        self.gcc = gcc
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="spj")
+        self._client = (JudgeServerClient(token=JUDGE_SERVER_TOKEN, server_base_url=JUDGE_SERVER_URL)
+                        if judge == "oj" else None)
+
+    def _compile_remote(self, version: str, src: str) -> SPJ:
+        result = self._client.compile_spj(src, version, c_lang_spj_compile)
+        if not isinstance(result, dict):
+            raise SPJCompileError(f"Invalid response from judge server: {result}")
+        if result.get("err"):
+            raise SPJCompileError(f"{result['err']}: {result.get('data')}")
+        with self._lock:
+            self.stats["compiled"] += 1
+        return SPJ(version, src)
+
+    def _compile_local(self, version: str, src: str) -> SPJ:
+        exe_path = os.path.join(self.cache_dir, c_lang_spj_compile["exe_name"].format(spj_version=version))
+        if os.path.exists(exe_path):
+            with self._lock:
+                self.stats["reused"] += 1
+            return SPJ(version, src, exe_path)
+        gcc_path = shutil.which(self.gcc)
+        if gcc_path is None:
+            raise SPJCompileError(f"{self.gcc} not found")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        src_path = os.path.join(self.cache_dir, c_lang_spj_compile["src_name"].format(spj_version=version))
+        with open(src_path, 'w', encoding='utf-8') as f:
+            f.write(src)
+        # 先编译到临时文件再替换，并发或中断时缓存目录里不会留下不完整的可执行文件
+        tmp_path = f"{exe_path}.{threading.get_ident()}.tmp"
+        try:
+            proc = subprocess.run([gcc_path, *COMPILE_FLAGS, src_path, "-lm", "-o", tmp_path],
+                                  capture_output=True, timeout=c_lang_spj_compile["max_real_time"] / 1000)
+        except subprocess.TimeoutExpired:
+            raise SPJCompileError("SPJ compilation timed out") from None
+        if proc.returncode != 0:
+            raise SPJCompileError(proc.stderr.decode("utf-8", errors="replace").replace(self.cache_dir + os.sep, ""))
+        os.replace(tmp_path, exe_path)
+        with self._lock:
+            self.stats["compiled"] += 1
+        return SPJ(version, src, exe_path)
+
+    def _compile(self, version: str, src: str) -> SPJ:
+        return self._compile_remote(version, src) if self._client is not None else self._compile_local(version, src)
+
+    def submit(self, src: str) -> Future:
+        """提交编译（同一版本已提交过时直接返回原来的 Future）"""
+        version = spj_version(src)
+        with self._lock:
+            future = self._futures.get(version)
+            if future is None:
+                future = self._pool.submit(self._compile, version, src)
+                self._futures[version] = future
+        return future
+
+    def prepare(self, sources: Iterable[Optional[str]]) -> int:
+        """在后台提前编译所有特判程序，返回不同版本的个数"""
+        sources = {src for src in sources if src}
+        for src in sources:
+            self.submit(src)
+        return len(sources)
+
+    def get(self, src: str) -> SPJ:
+        """等待并返回特判程序的编译结果；编译失败时抛出 SPJCompileError"""
+        future = self.submit(src)
+        try:
+            return future.result()
+        except SPJCompileError:
+            with self._lock:
+                self.stats["failed"] += 1
+            raise
+        except Exception:
+            with self._lock:
+                if self._futures.get(spj_version(src)) is future:
+                    del self._futures[spj_version(src)]
+            logging.warning("特判程序编译请求失败，下次评测时重试", exc_info=True)
+            raise
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
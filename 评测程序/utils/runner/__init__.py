@@ -0,0 +1,10 @@
+from .inference import ModelInferenceRunner, get_console, setup_logging
+
+__all__ = ['ModelInferenceRunner', 'console', 'get_console', 'setup_logging']
+
+
+def __getattr__(name: str):
+    # console 在第一次访问时才创建（导入 rich）
+    if name == "console":
+        return get_console()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
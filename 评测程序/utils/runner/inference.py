@@ -0,0 +1,706 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import time
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from datetime import datetime
+from utils.oj_runner.client import is_verdict, run_c_code_in_oj
+from utils.oj_runner.case_pack import CasePack, build_case_pack, case_pack_path
+from utils.oj_runner.compare import DEFAULT_MODE
+from utils.oj_runner.local import run_c_code_locally
+from utils.oj_runner.precheck import Prechecker
+from utils.oj_runner.spj import SPJCache, SPJCompileError, spj_cache_path, spj_version
+from utils.solution import VerdictCache, extract_code
+from utils.dataset.records import TestCaseRecord, load_test_data
+from utils.dataset.tokens import MAX_PROMPT_TOKENS, prompt_tokens
+from utils.checkpoint import SQLiteResultStore, TestCaseTable, WorkJournal, in_shard, journal_path, side_table_path
+from utils.metrics import MetricsFileWriter, MetricsServer, PhaseTimer, RunMetrics
+from utils.async_io import (BackgroundWriter, BatchedFileHandler, ErrorLogger, LoggedError,
+                            start_queue_logging)
+
+if TYPE_CHECKING:
+    from rich.console import Console
+    from rich.progress import Progress
+
+_console: Optional["Console"] = None
+
+
+def get_console() -> "Console":
+    """共用的 rich 控制台，第一次输出时才导入 rich"""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
+
+
+def __getattr__(name: str):
+    # 兼容 `from utils.runner.inference import console`
+    if name == "console":
+        return get_console()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def setup_logging(log_dir: str = "logs", prefix: str = "inference", console_output: bool = False):
+    """日志经队列由后台线程写出，返回的 QueueListener 需在结束时 stop()"""
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    log_file = os.path.join(log_dir, f"{prefix}_{timestamp}.log")
+    handlers = [BatchedFileHandler(log_file)]
+    if console_output:
+        from rich.logging import RichHandler
+        handlers.append(RichHandler(rich_tracebacks=True, console=get_console()))
+    return start_queue_logging(handlers)
+
+
+class ModelInferenceRunner:
+    """
+    评测运行器
+
+    指定 response_file 时从本地批量推理结果中读取模型响应（离线评测），
+    否则按 model 在线调用大模型接口（"ark" 为火山方舟，其余为讯飞星火）。
+    """
+
+    def __init__(self, test_data_file: str, checkpoint_file: str = "checkpoint.json",
+                 response_file: Optional[str] = None, request_interval: float = 1.0,
+                 db_path: Optional[str] = None, stage: str = "default",
+                 metrics_port: Optional[int] = None, metrics_file: Optional[str] = None,
+                 timing_events_file: Optional[str] = None, error_payload_sample_rate: float = 0.0,
+                 flush_interval: float = 2.0, flush_batch: int = 50,
+                 journal_file: Optional[str] = None, max_attempts: int = 3,
+                 shard: Optional[Tuple[int, int]] = None, extract_policy: str = "last",
+                 precheck: bool = False, precheck_workers: int = 4, dedup: bool = True,
+                 max_prompt_tokens: Optional[int] = MAX_PROMPT_TOKENS,
+                 judge: str = "oj", case_pack: Optional[str] = None, compare_mode: str = DEFAULT_MODE,
+                 spj_workers: int = 4, spj_cache_dir: Optional[str] = None):
+        self.test_data_file = test_data_file
+        self.checkpoint_file = checkpoint_file
+        self.log_dir = "logs"
+        self.error_log_file = os.path.join(
+            self.log_dir,
+            f"error_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        )
+        os.makedirs(self.log_dir, exist_ok=True)
+        # 错误日志每条一行，只引用test_id/test_case_ref；按比例抽样的测试点附带完整上下文。
+        # 后台写线程随每次 run_inference 启动和关闭，多次运行追加到同一个文件
+        self.error_payload_sample_rate = error_payload_sample_rate
+        self.error_logger: Optional[ErrorLogger] = None
+        self.test_data = self._load_test_data()
+        self.test_case_table = TestCaseTable(side_table_path(checkpoint_file))
+        # 指定db_path时结果写入SQLite库，checkpoint JSON不再使用
+        self.store = SQLiteResultStore(db_path) if db_path else None
+        self.stage = stage
+        # 实时指标：metrics_port 开启本地 /metrics 端点，metrics_file 定期刷新指标文件
+        self.metrics = RunMetrics(labels={"stage": stage})
+        self.metrics_port = metrics_port
+        self.metrics_file = metrics_file
+        # 各阶段耗时（读取响应、提取代码、评测、写checkpoint、记录日志），每次 run_inference 重新计时，
+        # 结束时汇总并关闭事件文件（多次运行追加到同一个文件）
+        self.timing_events_file = timing_events_file
+        self.timer: Optional[PhaseTimer] = None
+        # 结果由后台线程攒批写入（checkpoint快照或SQLite批量upsert），主循环只入队；
+        # 写线程随每次 run_inference 启动，结束时写完剩余结果后关闭
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.writer: Optional[BackgroundWriter] = None
+        # 工作状态日志（pending/in_flight/done/failed_*），在 run_inference 中按模型打开
+        self.journal_file = journal_file
+        self.max_attempts = max_attempts
+        self.journal: Optional[WorkJournal] = None
+        # (i, N)：只评测按 test_id 哈希落在第 i 个分片的测试点
+        self.shard = shard
+        # 两个测试点之间的间隔（秒），在线调用时用于限速
+        self.request_interval = request_interval
+        # 提示词 token 数上限（读取测试数据中预先算好的 prompt_tokens），None 表示不限制
+        self.max_prompt_tokens = max_prompt_tokens
+        # 响应中有多个代码块时的选择策略，见 utils.solution.extract_code
+        self.extract_policy = extract_policy
+        # 本机 gcc -fsyntax-only 预检查，编译错误不再提交评测机；检查线程池每次 run_inference 创建
+        self.precheck = precheck
+        self.precheck_workers = precheck_workers
+        self.prechecker: Optional[Prechecker] = None
+        # "oj" 提交评测机，"local" 用本机 gcc 编译运行（无沙箱，仅用于隔离环境）
+        self.judge = judge
+        # 本地评测的输出比较模式，见 utils.oj_runner.compare
+        self.compare_mode = compare_mode
+        # 测试用例二进制包：默认使用测试数据旁已有的 .cases.pack，指定路径但文件不存在时现场生成
+        pack_file = case_pack or case_pack_path(test_data_file)
+        if case_pack and not os.path.exists(pack_file):
+            build_case_pack(test_data_file, pack_file)
+        self.case_pack_file = pack_file if os.path.exists(pack_file) else None
+        # 每次 run_inference 打开，结束时关闭（内存映射）
+        self.case_pack: Optional[CasePack] = None
+        # 多解题目的特判程序：按 spj_version 缓存，每次 run_inference 开始时创建并提前编译（本地评测编译到 spj_cache_dir）
+        self.spj_cache_dir = spj_cache_dir or spj_cache_path(test_data_file)
+        self.spj_workers = spj_workers
+        self.has_spj = any(record.spj_code for record in self.test_data)
+        self.spj_cache: Optional[SPJCache] = None
+        # 同一题目下归一化后相同的代码只评测一次，其余复用代表提交的结论
+        self.verdicts = VerdictCache() if dedup else None
+        # 本进程最后一次写入的 checkpoint 的 (size, mtime_ns)，用于判断其他进程是否写过
+        self._checkpoint_stat: Optional[Tuple[int, int]] = None
+        self.completed_tests = self._load_checkpoint()
+        self.statistics = {
+            'total': 0,
+            'passed': 0,
+            'failed': 0,
+            'error': 0
+        }
+        self.response_data = self._load_response_data(response_file) if response_file else None
+
+    def _load_response_data(self, response_file: str) -> Dict[int, str]:
+        """加载本地响应文件"""
+        responses = {}
+        try:
+            with open(response_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    record = json.loads(line)
+                    if record["error"] is None:
+                        # 提取test_id：从custom_id中获取数字部分
+                        test_id = int(record["custom_id"].split("-")[-1])
+                        content = record["response"]["body"]["choices"][0]["message"]["content"]
+                        responses[test_id] = content
+        except Exception as e:
+            logging.error(f"加载响应文件失败: {str(e)}")
+            raise
+        return responses
+
+    def _load_test_data(self) -> List[TestCaseRecord]:
+        # 同题目共享测试用例列表，提示词压缩保存，整个运行期间常驻内存的只有这份紧凑表示
+        return load_test_data(self.test_data_file)
+
+    def _load_checkpoint(self) -> Dict[int, Dict]:
+        if self.store is not None:
+            return {}
+        if os.path.exists(self.checkpoint_file):
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+            # 旧格式checkpoint在每条记录中内联了test_case，迁移为共享表引用
+            if self.test_case_table.compact(checkpoint):
+                self.test_case_table.save()
+            return checkpoint
+        return {}
+
+    def _merge_checkpoint_on_disk(self) -> None:
+        """读入其他进程写入磁盘的结果（本进程上次写入之后文件没有变化时跳过）"""
+        try:
+            stat = os.stat(self.checkpoint_file)
+        except FileNotFoundError:
+            return
+        if (stat.st_size, stat.st_mtime_ns) == self._checkpoint_stat:
+            return
+        with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+            on_disk = json.load(f)
+        self.test_case_table.compact(on_disk)
+        for test_id, record in on_disk.items():
+            self.completed_tests.setdefault(test_id, record)
+        self.test_case_table.merge(TestCaseTable(side_table_path(self.checkpoint_file)))
+
+    def _save_checkpoint(self) -> None:
+        # 多个进程共用同一个 checkpoint 时，在工作状态日志的文件锁内先合并磁盘上的版本再替换，
+        # 其他进程已写入（并已在日志中记为 done）的结果不会被覆盖
+        with self.journal.locked() if self.journal is not None else nullcontext():
+            self._merge_checkpoint_on_disk()
+            self.test_case_table.save()
+            # 先写临时文件并fsync再替换，中断时不会留下半截的checkpoint
+            tmp_path = f"{self.checkpoint_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.completed_tests, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.checkpoint_file)
+            stat = os.stat(self.checkpoint_file)
+            self._checkpoint_stat = (stat.st_size, stat.st_mtime_ns)
+
+    def _record_result(self, test_id: int, result: Dict, test_cases: List[Dict]) -> None:
+        """提交单条结果到后台写线程"""
+        self.writer.submit((test_id, result, test_cases))
+
+    def _write_results(self, batch: List[tuple]) -> None:
+        """在后台写线程中执行：数据库模式下批量upsert，否则更新后写一次checkpoint快照"""
+        with self.timer.span("checkpoint_write"):
+            self._write_batch(batch)
+        # 结果落盘之后才记为 done，中断时最多重评未落盘的测试点
+        if self.journal is not None:
+            self.journal.mark_done(test_id for test_id, _, _ in batch)
+
+    def _write_batch(self, batch: List[tuple]) -> None:
+        if self.store is not None:
+            by_model: Dict[str, Dict[str, Dict]] = {}
+            test_cases = {}
+            for test_id, result, cases in batch:
+                by_model.setdefault(result['model'], {})[str(test_id)] = result
+                test_cases[result['test_case_ref']] = cases
+            for model, records in by_model.items():
+                self.store.upsert_many(model, self.stage, records)
+            self.store.save_test_cases(test_cases)
+        else:
+            for test_id, result, _ in batch:
+                self.completed_tests[str(test_id)] = result
+            self._save_checkpoint()
+
+    def _drop_results(self, batch: List[tuple]) -> None:
+        """在后台写线程中执行：多次重试仍未落盘的结果退回待评测状态，下次运行重新评测"""
+        if self.store is None:
+            for test_id, _, _ in batch:
+                self.completed_tests.pop(str(test_id), None)
+        if self.journal is not None:
+            self.journal.release((test_id for test_id, _, _ in batch), "WRITE_ERROR")
+
+    def _extract_code_from_response(self, response: str) -> Optional[str]:
+        try:
+            return extract_code(response, self.extract_policy)
+        except Exception as e:
+            logging.error(f"代码提取失败: {str(e)}")
+            return None
+    def _log_detailed_error(self, test_id: int, error_type: str, error_msg: str,
+                       context: Dict = None, exception: Exception = None) -> None:
+        """
+        详细记录错误信息到日志
+
+        Args:
+            test_id: 测试用例ID
+            error_type: 错误类型
+            error_msg: 错误信息
+            context: 相关上下文数据
+            exception: 异常对象
+        """
+        with self.timer.span("logging", test_id):
+            self.error_logger.log(test_id, error_type, error_msg, context, exception)
+            # 主日志只留一行摘要，完整记录见 error_log_file
+            logging.error(f"{error_type} - ID: {test_id}: {error_msg.splitlines()[0] if error_msg else ''}")
+
+    def display_statistics(self):
+        from rich.table import Table
+
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("总数", style="cyan")
+        table.add_column("通过", style="green")
+        table.add_column("失败", style="red")
+        table.add_column("错误", style="yellow")
+        table.add_column("通过率", style="cyan")
+
+        pass_rate = (self.statistics['passed'] / self.statistics['total'] * 100) if self.statistics['total'] > 0 else 0
+
+        table.add_row(
+            str(self.statistics['total']),
+            str(self.statistics['passed']),
+            str(self.statistics['failed']),
+            str(self.statistics['error']),
+            f"{pass_rate:.2f}%"
+        )
+
+        get_console().print("\n[bold]测试统计[/bold]")
+        get_console().print(table)
+
+    def display_timings(self):
+        rows = self.timer.summary() if self.timer is not None else []
+        if not rows:
+            return
+        from rich.table import Table
+
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("阶段", style="cyan")
+        table.add_column("次数", justify="right")
+        table.add_column("总耗时(s)", justify="right")
+        table.add_column("平均(ms)", justify="right")
+        table.add_column("P50(ms)", justify="right")
+        table.add_column("P95(ms)", justify="right")
+        table.add_column("最大(ms)", justify="right")
+        for row in rows:
+            table.add_row(
+                row["phase"],
+                str(row["count"]),
+                f"{row['total']:.2f}",
+                f"{row['mean'] * 1000:.1f}",
+                f"{row['p50'] * 1000:.1f}",
+                f"{row['p95'] * 1000:.1f}",
+                f"{row['max'] * 1000:.1f}"
+            )
+        get_console().print("\n[bold]阶段耗时[/bold]")
+        get_console().print(table)
+
+    def _record_judge_timings(self, test_id: int, timings: Dict) -> None:
+        """
+        把评测请求拆分为 ping / 网络+排队 / 编译 / 评测机运行时间
+
+        本地评测直接测得编译时间；评测机不报告编译时间，按请求总耗时减去运行时间和一次 ping 往返估算。
+        没有运行时间（编译错误、评测机返回异常结果）时不做拆分，只记录能测得的部分。
+        """
+        ping = timings.get("ping")
+        if ping is not None:
+            self.timer.record("judge_ping", ping, test_id)
+        compile_time = timings.get("judge_compile")
+        if compile_time is not None:
+            self.timer.record("judge_compile", compile_time, test_id)
+        if "judge_request" not in timings or "judge_server" not in timings:
+            return
+        server_time = timings["judge_server"]
+        overhead = max(0.0, timings["judge_request"] - server_time)
+        if compile_time is None and ping is not None:
+            compile_time = max(0.0, overhead - ping)
+            self.timer.record("judge_compile", compile_time, test_id)
+        self.timer.record("judge_network", max(0.0, overhead - (compile_time or 0.0)), test_id)
+        self.timer.record("judge_server", server_time, test_id)
+
+    def _get_response(self, test_id: int, prompt: str, model: str, context: Dict,
+                      progress: "Progress", task_id: int) -> str:
+        """离线模式读取本地响应，在线模式调用大模型接口"""
+        if self.response_data is not None:
+            progress.update(task_id, description=f"[cyan]读取模型响应 (ID: {test_id})")
+            with self.timer.span("lookup", test_id):
+                response = self.response_data.get(test_id)
+            if response is None:
+                self._log_detailed_error(
+                    test_id,
+                    "MISSING_RESPONSE",
+                    "本地响应文件中找不到对应的测试ID",
+                    context
+                )
+                raise LoggedError(f"测试ID {test_id} 的响应不存在", "MISSING_RESPONSE", retriable=False)
+            return response
+
+        progress.update(task_id, description=f"[cyan]获取模型响应 (ID: {test_id})")
+        try:
+            llm_start = time.perf_counter()
+            with self.timer.span("llm", test_id):
+                if model == "ark":
+                    from utils.llm_invoke.deepseek import get_ark_response
+                    response = get_ark_response(prompt)
+                else:
+                    from utils.llm_invoke.spark import get_ebyte_response
+                    response = get_ebyte_response(prompt)
+            self.metrics.observe('llm_latency_seconds', time.perf_counter() - llm_start)
+            return response
+        except Exception as e:
+            self._log_detailed_error(
+                test_id,
+                "MODEL_RESPONSE_ERROR",
+                "获取模型响应失败",
+                context,
+                e
+            )
+            raise LoggedError("获取模型响应失败", "MODEL_RESPONSE_ERROR") from e
+
+    def _judge(self, test_id: int, code: str, test_cases: List[Dict], context: Dict,
+               progress: "Progress", task_id: int, spj_code: Optional[str] = None) -> Tuple[bool, str]:
+        """
+        同题目下已评测过归一化相同的代码时复用其结论；
+        本地预检查不通过时直接判为编译错误，否则提交评测机（多解题目附带已编译的特判程序）
+        """
+        ref = context["test_case_ref"]
+        # 多解题目的结论取决于特判程序，按 spj_version 分组，特判程序修改后（或之前按逐字比较得出的）结论不再复用
+        group = f"{ref}@spj-{spj_version(spj_code)}" if spj_code else ref
+        if self.verdicts is not None:
+            verdict = self.verdicts.lookup(group, code)
+            if verdict is not None:
+                rep_id, passed, message = verdict
+                self.metrics.inc('tests_deduplicated')
+                context["test_result"] = {"passed": passed, "message": message, "dedup_of": rep_id}
+                return passed, message
+
+        if self.prechecker is not None:
+            with self.timer.span("precheck", test_id):
+                ok, message = self.prechecker.check(code)
+            if not ok:
+                self.metrics.inc('tests_prechecked')
+                context["test_result"] = {"passed": False, "message": message, "prechecked": True}
+                if self.verdicts is not None:
+                    self.verdicts.store(group, code, test_id, False, message)
+                return False, message
+
+        progress.update(task_id, description=f"[cyan]运行测试 (ID: {test_id})")
+        try:
+            judge_start = time.perf_counter()
+            judge_timings = {}
+            judge = (functools.partial(run_c_code_locally, compare=self.compare_mode)
+                     if self.judge == "local" else run_c_code_in_oj)
+            packed = self.case_pack.group(ref) if self.case_pack is not None else None
+            spj = self.spj_cache.get(spj_code) if spj_code and self.spj_cache is not None else None
+            with self.timer.span("judge", test_id):
+                passed, message = judge(code, test_cases, judge_timings, packed=packed, spj=spj)
+            self.metrics.observe('judge_latency_seconds', time.perf_counter() - judge_start)
+            self._record_judge_timings(test_id, judge_timings)
+        except SPJCompileError as e:
+            # 特判程序本身编译不通过，重试也不会成功；修改特判程序后 spj_version 变化，工作状态日志会重新领取
+            self._log_detailed_error(test_id, "SPJ_COMPILE_ERROR", "特判程序编译失败", context, e)
+            raise LoggedError("特判程序编译失败", "SPJ_COMPILE_ERROR", retriable=False) from e
+        except Exception as e:
+            self._log_detailed_error(
+                test_id,
+                "TEST_EXECUTION_ERROR",
+                "代码执行测试失败",
+                context,
+                e
+            )
+            raise LoggedError("代码执行测试失败", "TEST_EXECUTION_ERROR") from e
+        if not is_verdict(message):
+            # 连接失败、评测机出错等不是对代码的结论，不写入结果，下次运行重新评测
+            self._log_detailed_error(test_id, "JUDGE_ERROR", message, context)
+            raise LoggedError(message, "JUDGE_ERROR", retriable=True)
+        context["test_result"] = {"passed": passed, "message": message}
+        if self.verdicts is not None:
+            self.verdicts.store(group, code, test_id, passed, message)
+        return passed, message
+
+    def _prefetch_precheck(self, test_case: Dict, completed) -> None:
+        """离线模式下提前提取后面测试点的代码并在后台预检查"""
+        if str(test_case['test_id']) in completed:
+            return
+        response = self.response_data.get(test_case['test_id'])
+        code = extract_code(response, self.extract_policy) if response else None
+        if code:
+            self.prechecker.submit(code)
+
+    def _input_key(self, test_case: Dict) -> str:
+        """
+        决定终止失败的输入的摘要：离线响应、代码提取策略、提示词 token 数及上限、特判程序版本
+
+        响应缺失、提示词过长、代码提取失败等在工作状态日志中记为 failed_final，
+        这些输入变化后（例如换了响应文件）不再跳过，重新评测。
+        """
+        response = self.response_data.get(test_case['test_id']) if self.response_data is not None else None
+        spj_code = test_case.get('spj_code')
+        parts = [response, self.extract_policy, self.max_prompt_tokens,
+                 prompt_tokens(test_case) if self.max_prompt_tokens else None,
+                 spj_version(spj_code) if spj_code else None]
+        return hashlib.sha1(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+    def process_test_case(self, test_id: int, test_case: Dict, model: str, progress: "Progress", task_id: int,
+                          input_key: Optional[str] = None) -> None:
+        """处理单个测试用例；input_key 见 _input_key，随终止失败记入工作状态日志"""
+        context = {
+            "test_id": test_id,
+            "model": model,
+            "test_case_ref": self.test_case_table.add(test_case['test_case'])
+        }
+        try:
+            # 获取模型响应
+            prompt = test_case['test_prompt']
+            # 如果内容太长就跳过
+            if self.max_prompt_tokens and prompt_tokens(test_case) > self.max_prompt_tokens:
+                logging.info(f"跳过测试 {test_id}，提示词过长")
+                self.metrics.inc('tests_skipped')
+                self.journal.mark_failed(test_id, "PROMPT_TOO_LONG", retriable=False, input_key=input_key)
+                return
+            response = self._get_response(test_id, prompt, model, context, progress, task_id)
+            context["model_response"] = response
+            # 提取代码（_extract_code_from_response 自身不抛异常，失败时返回None）
+            with self.timer.span("extract", test_id):
+                code = self._extract_code_from_response(response)
+            if not code:
+                self._log_detailed_error(
+                    test_id,
+                    "CODE_EXTRACTION_ERROR",
+                    "无法从响应中提取代码",
+                    context
+                )
+                raise LoggedError("无法从响应中提取代码", "CODE_EXTRACTION_ERROR", retriable=False)
+            context["extracted_code"] = code
+
+            # 运行测试
+            passed, message = self._judge(test_id, code, test_case['test_case'], context, progress, task_id,
+                                          test_case.get('spj_code'))
+
+            # 更新统计
+            self.statistics['total'] += 1
+            self.metrics.inc('tests_total')
+            if passed:
+                self.statistics['passed'] += 1
+                self.metrics.inc('tests_passed')
+                get_console().print(f"[green]✓ 测试 {test_id} 通过[/green]")
+                logging.info(f"测试通过 - ID: {test_id}")
+            else:
+                self.statistics['failed'] += 1
+                self.metrics.inc('tests_failed')
+                #get_console().print(f"[red]✗ 测试 {test_id} 失败: {message}[/red]")
+                self._log_detailed_error(
+                    test_id,
+                    "TEST_FAILURE",
+                    f"测试失败: {message}",
+                    context
+                )
+
+            # 记录结果
+            result = {
+                'timestamp': datetime.now().isoformat(),
+                'passed': passed,
+                'message': message,
+                'code': code,
+                'response': response,
+                'model': model,
+                'test_case_ref': context['test_case_ref']
+            }
+            if "dedup_of" in context["test_result"]:
+                result['dedup_of'] = context["test_result"]["dedup_of"]
+
+            with self.timer.span("checkpoint_submit", test_id):
+                self._record_result(test_id, result, test_case['test_case'])
+
+        except LoggedError as e:
+            # 具体错误已在发生处记录
+            self.statistics['error'] += 1
+            self.metrics.inc('tests_error')
+            self.journal.mark_failed(test_id, e.error_type, e.retriable, input_key)
+        except Exception as e:
+            self.statistics['error'] += 1
+            self.metrics.inc('tests_error')
+            self.journal.mark_failed(test_id, "UNEXPECTED_ERROR", input_key=input_key)
+            self._log_detailed_error(
+                test_id,
+                "UNEXPECTED_ERROR",
+                "处理测试用例时发生意外错误",
+                context,
+                e
+            )
+
+    def run_inference(self, start_id: int = 1, end_id: Optional[int] = None, model: str = "ark") -> None:
+        # 确定要处理的测试用例范围
+        test_cases = [tc for tc in self.test_data
+                     if tc['test_id'] >= start_id and
+                     (end_id is None or tc['test_id'] <= end_id) and
+                     in_shard(tc['test_id'], self.shard)]
+
+        # self.statistics['total'] = len(test_cases)
+        self.statistics['total'] = 0
+        # 断点续测：数据库模式下直接按索引查询已完成的测试ID
+        completed = (self.store.completed_ids(model, self.stage)
+                     if self.store is not None else self.completed_tests)
+        exporters = []
+        self.timer = None
+        try:
+            # 本次运行的资源都在 try 中创建，其中任何一步（包括预填充去重结果、提交特判程序编译）失败时，
+            # finally 只关闭已经创建的部分
+            self.timer = PhaseTimer(self.timing_events_file)
+            self.error_logger = ErrorLogger(self.error_log_file, self.error_payload_sample_rate)
+            self.journal = WorkJournal(self._journal_file(model), self.max_attempts)
+            self.case_pack = CasePack(self.case_pack_file) if self.case_pack_file is not None else None
+            if self.precheck:
+                self.prechecker = Prechecker(max_workers=self.precheck_workers)
+                if not self.prechecker.available:
+                    self.prechecker = None
+            self.writer = BackgroundWriter(self._write_results, self.flush_interval, self.flush_batch,
+                                           name="checkpoint-writer", on_drop=self._drop_results)
+            if self.verdicts is not None:
+                self.verdicts.seed(self.store.iter_records(model, self.stage)
+                                   if self.store is not None else self.completed_tests.items())
+            pending = sum(1 for tc in test_cases if str(tc['test_id']) not in completed)
+            if self.has_spj:
+                self.spj_cache = SPJCache(self.judge, self.spj_cache_dir, self.spj_workers)
+                count = self.spj_cache.prepare(tc.get('spj_code') for tc in test_cases
+                                               if str(tc['test_id']) not in completed)
+                get_console().print(f"后台编译 {count} 个特判程序")
+            self.metrics.set_gauge('queue_depth', pending)
+            self.metrics.started = time.time()
+
+            exporters = self._start_metrics_exporters()
+            self._run_test_cases(test_cases, completed, model, pending)
+        finally:
+            # 包括 KeyboardInterrupt 在内，退出前写完所有已提交的结果
+            if self.writer is not None:
+                with self.timer.span("checkpoint_flush"):
+                    self.writer.close()
+                self.writer = None
+            if self.journal is not None:
+                get_console().print(f"工作状态: {dict(self.journal.counts())}")
+                self.journal.close()
+                self.journal = None
+            if self.prechecker is not None:
+                get_console().print(f"本地预检查: {dict(self.prechecker.stats)}")
+                self.prechecker.close()
+                self.prechecker = None
+            if self.verdicts is not None:
+                get_console().print(f"重复代码去重: {self.verdicts.summary()}")
+            if self.case_pack is not None:
+                self.case_pack.close()
+                self.case_pack = None
+            if self.spj_cache is not None:
+                get_console().print(f"特判程序: {dict(self.spj_cache.stats)}")
+                self.spj_cache.close()
+                self.spj_cache = None
+            for exporter in exporters:
+                exporter.stop()
+            if self.timer is not None:
+                self.display_timings()
+                self.timer.close()
+            if self.error_logger is not None:
+                self.error_logger.close()
+                self.error_logger = None
+
+    def _journal_file(self, model: str) -> str:
+        if self.journal_file:
+            return self.journal_file
+        if self.store is not None:
+            return journal_path(self.store.db_path, model, self.stage)
+        return journal_path(self.checkpoint_file)
+
+    def _start_metrics_exporters(self) -> List:
+        exporters = []
+        if self.metrics_port:
+            exporters.append(MetricsServer(self.metrics, self.metrics_port))
+            logging.info(f"实时指标端点: http://127.0.0.1:{self.metrics_port}/metrics")
+        if self.metrics_file:
+            exporters.append(MetricsFileWriter(self.metrics, self.metrics_file))
+        started = []
+        try:
+            for exporter in exporters:
+                exporter.start()
+                started.append(exporter)
+        except Exception:
+            # 例如端口已被占用：停掉已经启动的导出器后再抛出
+            for exporter in started:
+                exporter.stop()
+            raise
+        return started
+
+    def _run_test_cases(self, test_cases: List[Dict], completed, model: str, pending: int) -> None:
+        from rich.progress import (BarColumn, Progress, SpinnerColumn, TaskProgressColumn, TextColumn,
+                                   TimeRemainingColumn)
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TaskProgressColumn(),
+            TimeRemainingColumn(),
+            console=get_console()
+        ) as progress:
+
+            task = progress.add_task(
+                "[cyan]运行测试...",
+                total=len(test_cases)
+            )
+
+            # 离线模式下预检查提前 lookahead 个测试点在后台进行
+            lookahead = self.prechecker.max_workers * 2 if self.prechecker and self.response_data else 0
+            for upcoming in test_cases[:lookahead]:
+                self._prefetch_precheck(upcoming, completed)
+
+            for index, test_case in enumerate(test_cases):
+                test_id = test_case['test_id']
+                if lookahead and index + lookahead < len(test_cases):
+                    self._prefetch_precheck(test_cases[index + lookahead], completed)
+
+                # 已有结果，或已终止失败（且输入未变）/正由其他进程评测的测试点都跳过
+                if str(test_id) in completed:
+                    progress.advance(task)
+                    continue
+                input_key = self._input_key(test_case)
+                if not self.journal.claim(test_id, input_key):
+                    progress.advance(task)
+                    continue
+
+                self.process_test_case(test_id, test_case, model, progress, task, input_key)
+                progress.advance(task)
+                pending -= 1
+                self.metrics.set_gauge('queue_depth', pending)
+                if self.request_interval:
+                    time.sleep(self.request_interval)
+
+            # 完成后显示统计信息
+            self.display_statistics()
@@ -0,0 +1,6 @@
+from .extract import POLICIES, CodeBlock, extract_code, iter_code_blocks
+from .normalize import canonical_fingerprint, exact_fingerprint, normalize_code
+from .dedup import VerdictCache
+
+__all__ = ['POLICIES', 'CodeBlock', 'extract_code', 'iter_code_blocks',
+           'canonical_fingerprint', 'exact_fingerprint', 'normalize_code', 'VerdictCache']
@@ -0,0 +1,112 @@
+import argparse
+import json
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+
+from ..oj_runner.client import is_verdict
+from .extract import extract_code
+from .normalize import canonical_fingerprint, exact_fingerprint
+
+
+class VerdictCache:
+    """
+    同一题目（相同 test_case_ref，多解题目另加 spj_version，由调用方拼入分组键）下归一化代码相同的提交只评测一次
+
+    精确归一化（去注释、统一空白）相同的提交直接复用代表提交的评测结论；
+    标识符归一化后的指纹只用于统计近似重复的比例。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._verdicts: Dict[Tuple[str, str], Tuple[int, bool, str]] = {}
+        self._exact_groups = set()
+        self._near_groups = set()
+        self.submissions = 0
+        self.reused = 0
+
+    def lookup(self, test_case_ref: str, code: str) -> Optional[Tuple[int, bool, str]]:
+        """登记一个提交；同组已有可复用的结论时返回 (代表test_id, passed, message)"""
+        key = (test_case_ref, exact_fingerprint(code))
+        near_key = (test_case_ref, canonical_fingerprint(code))
+        with self._lock:
+            self.submissions += 1
+            self._exact_groups.add(key)
+            self._near_groups.add(near_key)
+            verdict = self._verdicts.get(key)
+            if verdict is not None:
+                self.reused += 1
+            return verdict
+
+    def store(self, test_case_ref: str, code: str, test_id, passed: bool, message: str) -> None:
+        # 只有评测结论与评测机状态无关，可以复用；网络错误、评测机故障等需要重新评测
+        if not is_verdict(message):
+            return
+        key = (test_case_ref, exact_fingerprint(code))
+        with self._lock:
+            self._verdicts.setdefault(key, (test_id, passed, message))
+
+    def seed(self, records: Iterable[Tuple[str, Dict]]) -> int:
+        """
+        用已有结果（test_id, record）预先填充，续测时同组的新提交也能复用
+
+        记录中只有 test_case_ref，按它分组；多解题目在评测时按 test_case_ref 加 spj_version 分组，
+        不会命中这里填充的结论。
+        """
+        count = 0
+        for test_id, record in records:
+            if record.get("code") and record.get("test_case_ref") and "dedup_of" not in record:
+                self.store(record["test_case_ref"], record["code"], test_id, record.get("passed"), record.get("message"))
+                count += 1
+        return count
+
+    def summary(self) -> Dict:
+        with self._lock:
+            submissions = self.submissions
+            return {
+                "submissions": submissions,
+                "exact_groups": len(self._exact_groups),
+                "near_groups": len(self._near_groups),
+                "reused": self.reused,
+                "exact_dedup_ratio": 1 - len(self._exact_groups) / submissions if submissions else 0.0,
+                "near_dedup_ratio": 1 - len(self._near_groups) / submissions if submissions else 0.0,
+            }
+
+
+def dedup_stats(test_data_file: str, response_file: str, policy: str = "last") -> Dict:
+    """不评测，只统计离线响应文件中按题目分组后的重复比例"""
+    from ..dataset.records import load_test_data
+
+    refs = {record.test_id: record.test_case_ref for record in load_test_data(test_data_file)}
+    cache = VerdictCache()
+    missing = Counter()
+    with open(response_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get("error") is not None:
+                continue
+            test_id = int(record["custom_id"].split("-")[-1])
+            content = record["response"]["body"]["choices"][0]["message"]["content"]
+            code = extract_code(content, policy)
+            if code is None or test_id not in refs:
+                missing["no_code" if code is None else "unknown_test_id"] += 1
+                continue
+            cache.lookup(refs[test_id], code)
+    return {**cache.summary(), **missing}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="统计离线响应中按题目分组的重复提交比例")
+    parser.add_argument("test_data_file")
+    parser.add_argument("response_file")
+    parser.add_argument("--extract-policy", default="last")
+    args = parser.parse_args()
+
+    stats = dedup_stats(args.test_data_file, args.response_file, args.extract_policy)
+    print(f"提交 {stats['submissions']} 个: 精确归一化 {stats['exact_groups']} 组"
+          f"（去重率 {stats['exact_dedup_ratio']:.2%}），标识符归一化 {stats['near_groups']} 组"
+          f"（去重率 {stats['near_dedup_ratio']:.2%}）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import re
+from typing import List, NamedTuple, Optional
+
+# 开头的围栏（可带语言标记）到同样长度的围栏为止；没有闭合时延伸到结尾（响应被截断）。
+# 以字面量 ``` 开头，re 可以用快速子串查找跳过大段推理文本
+FENCE_RE = re.compile(
+    r"```(?P<extra>`*)[ \t]*(?P<lang>[^\s`]*)[^\n]*\n"
+    r"(?P<body>.*?)(?:```(?P=extra)|(?P<eof>\Z))",
+    re.S,
+)
+MAIN_RE = re.compile(r"\bmain\s*\(")
+
+C_LANGS = {"c", "h"}
+CPP_LANGS = {"cpp", "c++", "cc", "cxx", "hpp"}
+POLICIES = ("last", "first", "longest")
+
+
+class CodeBlock(NamedTuple):
+    lang: str
+    code: str
+    start: int
+    closed: bool
+
+
+def iter_code_blocks(response: str) -> List[CodeBlock]:
+    """一次扫描取出响应中所有围栏代码块"""
+    return [
+        CodeBlock(match.group("lang").lower(), match.group("body").strip(), match.start(), match.group("eof") is None)
+        for match in FENCE_RE.finditer(response)
+    ]
+
+
+def _rank(block: CodeBlock) -> Optional[tuple]:
+    """候选块的优先级，None 表示不是 C 代码块"""
+    if block.lang in C_LANGS:
+        lang_rank = 2
+    elif block.lang in CPP_LANGS:
+        lang_rank = 1
+    elif not block.lang:
+        lang_rank = 0
+    else:
+        return None
+    has_main = MAIN_RE.search(block.code) is not None
+    if lang_rank == 0 and not has_main:
+        # 未标注语言的块只有像完整程序时才考虑
+        return None
+    # 完整程序（含 main、围栏闭合）优先于推理过程中的片段，其次看语言标记
+    return has_main, block.closed, lang_rank
+
+
+def extract_code(response: str, policy: str = "last") -> Optional[str]:
+    """
+    从模型响应中提取要评测的 C 代码
+
+    候选块按 (是否含 main, 是否闭合, 语言标记 c > cpp > 未标注) 分级，只在最高一级中选择：
+    policy="last" 取最后一个（推理模型的最终答案通常在最后），"first" 取第一个，
+    "longest" 取最长的一个。
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"未知的代码提取策略: {policy}")
+    best_rank = None
+    candidates: List[CodeBlock] = []
+    for block in iter_code_blocks(response):
+        rank = _rank(block)
+        if rank is None or not block.code:
+            continue
+        if best_rank is None or rank > best_rank:
+            best_rank, candidates = rank, [block]
+        elif rank == best_rank:
+            candidates.append(block)
+    if not candidates:
+        return None
+    if policy == "first":
+        return candidates[0].code
+    if policy == "longest":
+        return max(candidates, key=lambda block: len(block.code)).code
+    return candidates[-1].code
+
+
+def _legacy_extract(response: str) -> Optional[str]:
+    """原先基于 str.find 的实现，只取第一个 ```c 块，用于基准对比"""
+    start_idx = response.find("```c")
+    if start_idx == -1:
+        return None
+    start_idx = response.find("\n", start_idx) + 1
+    end_idx = response.find("```", start_idx)
+    if end_idx == -1:
+        return None
+    return response[start_idx:end_idx].strip()
+
+
+def _benchmark(repeat: int = 200) -> None:
+    import timeit
+
+    snippet = "```c\nint helper(int x) { return x * 2; }\n```\n"
+    program = "```C\n#include <stdio.h>\nint main() {\n    printf(\"%d\\n\", 42);\n    return 0;\n}\n```\n"
+    reasoning = "让我们先分析题目。这里需要考虑边界情况，循环变量可能越界。\n" * 2000
+    responses = {
+        "短响应": "修复后的代码：\n" + program,
+        "长推理 + 片段 + 最终答案": reasoning + snippet + reasoning + program,
+        "多个候选块": (snippet + reasoning[:2000]) * 20 + program,
+    }
+    for name, response in responses.items():
+        new = timeit.timeit(lambda: extract_code(response), number=repeat) / repeat
+        old = timeit.timeit(lambda: _legacy_extract(response), number=repeat) / repeat
+        picked_main = "main" in (extract_code(response) or "")
+        legacy_main = "main" in (_legacy_extract(response) or "")
+        print(f"{name:<24} {len(response) / 1024:8.1f} KB  regex {new * 1e6:9.1f} us  "
+              f"str.find {old * 1e6:9.1f} us  取到完整程序: {picked_main} / {legacy_main}")
+
+
+if __name__ == "__main__":
+    _benchmark()
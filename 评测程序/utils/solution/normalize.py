@@ -0,0 +1,78 @@
+import hashlib
+import re
+from typing import List
+
+# C 词法：字符串/字符常量原样保留，注释丢弃
+_LEXEMES = r"""
+    (?P<comment>//(?:[^\n\\]|\\.)*|/\*.*?\*/)
+  | (?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+  | (?P<ident>[A-Za-z_]\w*)
+  | (?P<number>\.?\d(?:[eEpP][+-]|[\w.])*)
+  | (?P<space>\s+)
+  | (?P<punct>->|\+\+|--|<<=|>>=|<<|>>|<=|>=|==|!=|&&|\|\||[-+*/%&|^]=|\.\.\.|.)
+"""
+# 预处理行（# 只出现在其中）整行（含续行）作为一个记号，因为其中的换行有意义
+TOKEN_RE = re.compile(r"(?P<pp>\#(?:[^\n\\]|\\.)*) |" + _LEXEMES, re.S | re.X)
+# 预处理行内部按同样的词法切分，只是不再识别预处理行
+DIRECTIVE_RE = re.compile(_LEXEMES, re.S | re.X)
+
+C_KEYWORDS = frozenset("""
+    auto break case char const continue default do double else enum extern float for goto if inline int long
+    register restrict return short signed sizeof static struct switch typedef union unsigned void volatile while
+    _Bool _Complex _Imaginary
+""".split())
+
+
+def normalize_directive(text: str) -> str:
+    """
+    预处理行：去掉续行，记号之间的空白和注释统一为一个空格
+
+    字符串/字符常量原样保留；记号之间有无空白保持不变（#define F(x) 与 #define F (x) 含义不同）。
+    """
+    parts = []
+    for match in DIRECTIVE_RE.finditer(text[1:].replace("\\\n", "")):
+        if match.lastgroup in ("comment", "space"):
+            if parts and parts[-1] != " ":
+                parts.append(" ")
+        else:
+            parts.append(match.group())
+    return "#" + "".join(parts).strip()
+
+
+def tokenize(code: str) -> List[str]:
+    """去掉注释和空白后的记号序列"""
+    tokens = []
+    for match in TOKEN_RE.finditer(code):
+        kind = match.lastgroup
+        if kind == "comment" or kind == "space":
+            continue
+        text = match.group()
+        if kind == "pp":
+            text = normalize_directive(text)
+        tokens.append(text)
+    return tokens
+
+
+def normalize_code(code: str) -> str:
+    """去注释、统一空白后的代码；归一化结果相同的两份代码编译后行为一致"""
+    return " ".join(tokenize(code))
+
+
+def exact_fingerprint(code: str) -> str:
+    return hashlib.sha1(normalize_code(code).encode("utf-8")).hexdigest()
+
+
+def canonical_fingerprint(code: str) -> str:
+    """
+    在归一化基础上把标识符按首次出现的顺序重命名后的指纹
+
+    只改了变量名的近似重复提交得到相同的指纹；由于库函数名也会被重命名，
+    它只用于统计相似度，不能用来复用评测结果。
+    """
+    names = {}
+    canonical = []
+    for token in tokenize(code):
+        if (token[0].isalpha() or token[0] == "_") and token not in C_KEYWORDS:
+            token = names.setdefault(token, f"v{len(names)}")
+        canonical.append(token)
+    return hashlib.sha1(" ".join(canonical).encode("utf-8")).hexdigest()